@@ -0,0 +1,8 @@
+"""Async handler for the profile endpoint (see requests.asyncread)"""
+from requests.asyncread import response
+from .serializers import UserSerializer
+
+
+async def profile(request):
+    # The user was loaded by the async authentication
+    return response(UserSerializer(request.user).data)
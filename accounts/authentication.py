@@ -0,0 +1,138 @@
+"""JWT authentication with the token's user cached.
+
+Every authenticated call resolves the token to a User just so permission
+classes can read request.user.role. The fields authentication and the
+permission classes read are kept in the AUTH_USER_CACHE cache for
+AUTH_USER_CACHE_TTL seconds; the password hash is not, only the digest of it
+that revoked-token checks compare. Cache hits return a User with the other
+fields deferred, so they load on access and save() leaves them alone. The entry is dropped whenever the
+user is saved or deleted (see signals), so role changes, deactivations and
+password changes apply on the next request. Writes that skip signals, such
+as queryset.update(), are picked up when the entry expires.
+
+With the default local-memory cache each worker process keeps its own
+entries. Invalidation then reaches only the process that saved the user;
+other workers catch up within the TTL. Point CACHES at a shared backend
+(Redis, Memcached) to invalidate everywhere at once.
+"""
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# User fields kept in the cache (see entry() and from_entry())
+CACHED_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'name', 'role',
+    'is_active', 'is_staff', 'is_superuser',
+]
+
+# Per-process lookup counts, served by the auth_cache_stats view
+STATS = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def user_cache():
+    return caches[settings.AUTH_USER_CACHE]
+
+
+def cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def lookup(user_id):
+    """The user with this id, or None, from the database"""
+    return get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+
+
+def entry(user):
+    """The cached form of a user: CACHED_FIELDS and the password digest, not the hash"""
+    return {
+        'fields': {name: getattr(user, name) for name in CACHED_FIELDS},
+        'password_digest': get_md5_hash_password(user.password),
+    }
+
+
+def from_entry(data):
+    """A User built from a cache entry, with the uncached fields deferred"""
+    User = get_user_model()
+    fields = data['fields']
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in fields]
+    user = User.from_db(router.db_for_read(User), names, [fields[name] for name in names])
+    user._password_digest = data['password_digest']
+    return user
+
+
+def load_user(user_id):
+    """The user with this id (None if missing), from the cache while fresh"""
+    if not settings.AUTH_USER_CACHE_TTL:
+        return lookup(user_id)
+    data = user_cache().get(cache_key(user_id))
+    if data is not None:
+        STATS['hits'] += 1
+        return from_entry(data)
+    STATS['misses'] += 1
+    user = lookup(user_id)
+    if user is not None:
+        user_cache().set(cache_key(user_id), entry(user), settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+async def aload_user(user_id):
+    """load_user() for async views"""
+    if not settings.AUTH_USER_CACHE_TTL:
+        return await get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+    data = await user_cache().aget(cache_key(user_id))
+    if data is not None:
+        STATS['hits'] += 1
+        return from_entry(data)
+    STATS['misses'] += 1
+    user = await get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+    if user is not None:
+        await user_cache().aset(cache_key(user_id), entry(user), settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+def invalidate(user_id):
+    user_cache().delete(cache_key(user_id))
+    STATS['invalidations'] += 1
+
+
+def stats():
+    lookups = STATS['hits'] + STATS['misses']
+    return {
+        'pid': os.getpid(),
+        'ttl': settings.AUTH_USER_CACHE_TTL,
+        **STATS,
+        'hit_rate': round(STATS['hits'] / lookups, 4) if lookups else None,
+    }
+
+
+def check_user(user, validated_token):
+    """JWTAuthentication.get_user()'s checks on a loaded (or missing) user"""
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if api_settings.CHECK_REVOKE_TOKEN:
+        # Cached users carry the digest instead of the (deferred) password
+        digest = getattr(user, '_password_digest', None) or get_md5_hash_password(user.password)
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != digest:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user through the user cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return check_user(load_user(user_id), validated_token)
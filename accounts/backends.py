@@ -0,0 +1,88 @@
+"""Login by username or email.
+
+The login form takes either. This backend finds the user with one query over
+the unique username and email indexes and hashes the password once, where
+trying authenticate() by username and then again by email cost two backend
+passes and, for email logins, two PBKDF2 hashes.
+
+Failed logins are counted per account and client address in the
+AUTH_USER_CACHE cache, so an account's username and email share one budget;
+identifiers matching no account are counted by their normalized form. After LOGIN_FAILURE_LIMIT failures within
+LOGIN_FAILURE_WINDOW seconds, further attempts are refused before any
+hashing, so retried bad passwords in a login storm cost a cache read.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+
+from .authentication import user_cache
+
+User = get_user_model()
+
+
+def find_users(identifier):
+    """Users whose username or email is the identifier, the username match first"""
+    # A username match wins over another user's email, as it did before
+    return sorted(
+        User._default_manager.filter(Q(username=identifier) | Q(email=identifier))[:2],
+        key=lambda user: user.get_username() != identifier,
+    )
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """ModelBackend that also accepts the email address as the username.
+
+    Callers that already looked the identifier up can pass the result of
+    find_users() as `users` to skip the query.
+    """
+
+    def authenticate(self, request, username=None, password=None, users=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        candidates = find_users(username) if users is None else users
+        if not candidates:
+            # Hash anyway, as ModelBackend does, so unknown users take as long
+            User().set_password(password)
+            return None
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
+
+
+def failure_key(identifier, request=None, users=None):
+    if users is None:
+        users = find_users(identifier)
+    subject = f'user:{users[0].pk}' if users else f'name:{identifier.strip().lower()}'
+    address = request.META.get('REMOTE_ADDR', '') if request is not None else ''
+    digest = hashlib.md5(f'{subject}|{address}'.encode(), usedforsecurity=False).hexdigest()
+    return f'auth:login-failures:{digest}'
+
+
+def locked_out(identifier, request=None, users=None):
+    """Whether the identifier's account has used up its failed logins from this address"""
+    if not settings.LOGIN_FAILURE_LIMIT:
+        return False
+    return user_cache().get(failure_key(identifier, request, users), 0) >= settings.LOGIN_FAILURE_LIMIT
+
+
+def record_failure(identifier, request=None, users=None):
+    if not settings.LOGIN_FAILURE_LIMIT:
+        return
+    key = failure_key(identifier, request, users)
+    # The window runs from the first failure; incr() keeps the expiry
+    user_cache().add(key, 0, settings.LOGIN_FAILURE_WINDOW)
+    try:
+        user_cache().incr(key)
+    except ValueError:
+        user_cache().set(key, 1, settings.LOGIN_FAILURE_WINDOW)
+
+
+def clear_failures(identifier, request=None, users=None):
+    if settings.LOGIN_FAILURE_LIMIT:
+        user_cache().delete(failure_key(identifier, request, users))
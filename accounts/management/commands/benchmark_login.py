@@ -0,0 +1,154 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from accounts import backends
+from accounts.serializers import LoginSerializer
+from requests.benchmarking import generate_dataset, rolled_back
+
+User = get_user_model()
+
+PASSWORD = 'benchmark-password'
+
+# (name, login value, password). {username}/{email} are a generated user's.
+SCENARIOS = [
+    ('username', '{username}', PASSWORD),
+    ('email', '{email}', PASSWORD),
+    ('wrong password', '{email}', 'wrong-password'),
+    ('unknown user', 'nobody-{username}@example.com', PASSWORD),
+]
+
+
+@contextmanager
+def counting_hashes():
+    """Count password hashes computed by the default hasher"""
+    hasher = type(get_hasher())
+    encode = hasher.encode
+    counter = {'hashes': 0}
+
+    def counted(self, *args, **kwargs):
+        counter['hashes'] += 1
+        return encode(self, *args, **kwargs)
+
+    hasher.encode = counted
+    try:
+        yield counter
+    finally:
+        hasher.encode = encode
+
+
+def two_pass_login(username, password):
+    """The login flow before EmailOrUsernameBackend: by username, then by email"""
+    backend = ModelBackend()
+    user = backend.authenticate(None, username=username, password=password)
+    if not user:
+        try:
+            user_obj = User.objects.get(email=username)
+            user = backend.authenticate(None, username=user_obj.username, password=password)
+        except User.DoesNotExist:
+            user = None
+    return user
+
+
+def single_pass_login(username, password):
+    serializer = LoginSerializer(data={'email': username, 'password': password})
+    return serializer.validated_data['user'] if serializer.is_valid() else None
+
+
+class Command(BaseCommand):
+    help = ('Benchmark login: the two-pass username-then-email flow against the single-pass backend, '
+            'and failed-attempt lockout under repeated bad passwords (data is rolled back)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20,
+                            help='Users to log in as, in turn')
+        parser.add_argument('--iterations', type=int, default=10,
+                            help='Timed logins per scenario and flow')
+        parser.add_argument('--attempts', type=int, default=20,
+                            help='Bad-password attempts in the repeated-failure run')
+
+    def handle(self, *args, **options):
+        self.options = options
+        with rolled_back():
+            users = self.seed()
+            results = [
+                self.run(flow_name, flow, name, value, password, users)
+                for name, value, password in SCENARIOS
+                for flow_name, flow in (('two-pass', two_pass_login), ('single-pass', single_pass_login))
+            ]
+            storm = self.repeated_failures(users[0])
+        self.report(results, storm)
+
+    def seed(self):
+        created = generate_dataset('loginbench', self.options['users'], password=PASSWORD).users
+        users = list(User.objects.filter(pk__in=[pk for pks in created.values() for pk in pks]).order_by('pk'))
+        if not users:
+            raise CommandError('No users generated; raise --users')
+        return users
+
+    def run(self, flow_name, flow, name, value, password, users):
+        latencies, queries, hashes = [], [], []
+        for i in range(self.options['iterations']):
+            user = users[i % len(users)]
+            login = value.format(username=user.username, email=user.email)
+            with counting_hashes() as counter, CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                result = flow(login, password)
+                latencies.append((time.perf_counter() - start) * 1000)
+            if (result is not None) != (password == PASSWORD and 'nobody' not in value):
+                raise CommandError(f'{flow_name} login ({name}) returned {result!r}')
+            backends.clear_failures(login)
+            queries.append(len(captured))
+            hashes.append(counter['hashes'])
+        return {
+            'scenario': name,
+            'flow': flow_name,
+            'p50_ms': statistics.median(latencies),
+            'mean_ms': statistics.mean(latencies),
+            'queries': max(queries),
+            'hashes': max(hashes),
+        }
+
+    def repeated_failures(self, user):
+        """Bad passwords for one account from one address, through the API"""
+        client = Client()
+        statuses = []
+        with counting_hashes() as counter:
+            start = time.perf_counter()
+            for _ in range(self.options['attempts']):
+                response = client.post('/api/auth/login/', {'email': user.email, 'password': 'wrong-password'},
+                                       content_type='application/json')
+                statuses.append(response.status_code)
+            elapsed = time.perf_counter() - start
+        backends.clear_failures(user.email, response.wsgi_request)
+        return {
+            'attempts': len(statuses),
+            'rejected': statuses.count(400),
+            'refused': statuses.count(429),
+            'hashes': counter['hashes'],
+            'seconds': elapsed,
+        }
+
+    def report(self, results, storm):
+        self.stdout.write('='*78)
+        self.stdout.write(f"LOGIN BENCHMARK ({self.options['iterations']} logins per row, {get_hasher().algorithm})")
+        self.stdout.write('='*78)
+        self.stdout.write(f"{'scenario':<18}{'flow':<14}{'p50 (ms)':>10}{'mean (ms)':>11}{'queries':>9}{'hashes':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['scenario']:<18}{result['flow']:<14}{result['p50_ms']:>10.1f}{result['mean_ms']:>11.1f}"
+                f"{result['queries']:>9}{result['hashes']:>8}"
+            )
+        self.stdout.write('='*78)
+        self.stdout.write(
+            f"Repeated bad passwords: {storm['attempts']} attempts in {storm['seconds']:.1f}s, "
+            f"{storm['rejected']} rejected (400), {storm['refused']} refused (429), {storm['hashes']} hashes"
+        )
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from requests import counters
 from requests.models import PurchaseRequest, Approval, RequestItem
 from decimal import Decimal
 import random
@@ -181,10 +182,11 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'Successfully created {len(created_requests)} demo purchase requests with items and approvals!'))
 
         # Summary
-        total_requests = PurchaseRequest.objects.count()
-        approved_requests = PurchaseRequest.objects.filter(status='approved').count()
-        pending_requests = PurchaseRequest.objects.filter(status='pending').count()
-        rejected_requests = PurchaseRequest.objects.filter(status='rejected').count()
+        status_counts = counters.counts()
+        total_requests = sum(status_counts.values())
+        approved_requests = status_counts['approved']
+        pending_requests = status_counts['pending_l1'] + status_counts['pending_l2']
+        rejected_requests = status_counts['rejected_l1'] + status_counts['rejected_l2']
 
         self.stdout.write('\n' + '='*50)
         self.stdout.write('DEMO DATA SUMMARY:')
@@ -1,5 +1,6 @@
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
 from django.contrib.auth import authenticate
+from . import backends
 from .models import User
 
 
@@ -38,22 +39,18 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if username and password:
-            # Try to authenticate with username first
-            user = authenticate(username=username, password=password)
-            if not user:
-                # If not found, try with email
-                try:
-                    from django.contrib.auth import get_user_model
-                    User = get_user_model()
-                    user_obj = User.objects.get(email=username)
-                    user = authenticate(username=user_obj.username, password=password)
-                except User.DoesNotExist:
-                    user = None
-
+            request = self.context.get('request')
+            # One lookup by username or email and one password hash (see backends)
+            users = backends.find_users(username)
+            if backends.locked_out(username, request, users):
+                raise exceptions.Throttled(detail='Too many failed login attempts. Try again later.')
+            user = authenticate(request, username=username, password=password, users=users)
             if not user:
+                backends.record_failure(username, request, users)
                 raise serializers.ValidationError('Invalid credentials')
             if not user.is_active:
                 raise serializers.ValidationError('User account is disabled')
+            backends.clear_failures(username, request, users)
             attrs['user'] = user
             return attrs
         else:
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import authentication
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached user now, and again after commit in case a request
+    re-cached the old row while the transaction was open"""
+    authentication.invalidate(instance.pk)
+    transaction.on_commit(lambda: authentication.invalidate(instance.pk))
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import authentication
+
+User = get_user_model()
+
+
+@override_settings(LOGIN_FAILURE_LIMIT=5)
+class LoginLockoutTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='s9', email='s9@x.com', password='right-password')
+        self.client = Client()
+
+    def login(self, identifier, password):
+        return self.client.post('/api/auth/login/', {'email': identifier, 'password': password},
+                                content_type='application/json')
+
+    def test_username_and_email_share_the_failure_budget(self):
+        for _ in range(5):
+            self.assertEqual(self.login('s9', 'wrong-password').status_code, 400)
+        self.assertEqual(self.login('s9', 'right-password').status_code, 429)
+        self.assertEqual(self.login('s9@x.com', 'right-password').status_code, 429)
+
+    def test_unknown_identifiers_are_counted_case_insensitively(self):
+        for _ in range(5):
+            self.assertEqual(self.login('Nobody@x.com', 'wrong-password').status_code, 400)
+        self.assertEqual(self.login('nobody@x.com', 'wrong-password').status_code, 429)
+
+    def test_success_clears_failures(self):
+        for _ in range(4):
+            self.login('s9@x.com', 'wrong-password')
+        self.assertEqual(self.login('s9', 'right-password').status_code, 200)
+        self.assertEqual(self.login('s9@x.com', 'wrong-password').status_code, 400)
+
+
+@override_settings(AUTH_USER_CACHE_TTL=60)
+class CachedUserTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='approver', email='approver@x.com', password='right-password', role='approver1'
+        )
+
+    def test_cache_entry_leaves_out_the_password_hash(self):
+        authentication.load_user(self.user.pk)
+        data = cache.get(authentication.cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, repr(data))
+        self.assertNotIn('password', data['fields'])
+
+    def test_cached_user_authenticates_and_loads_other_fields_lazily(self):
+        authentication.load_user(self.user.pk)
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(0):
+            user = authentication.CachedJWTAuthentication().get_user(token)
+            self.assertEqual((user.pk, user.role, user.is_active), (self.user.pk, 'approver1', True))
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('right-password'))
+
+    def test_profile_served_from_cache(self):
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(client.get('/api/auth/profile/').json()['role'], 'approver1')
+        response = client.get('/api/auth/profile/')
+        self.assertEqual(response.json()['email'], 'approver@x.com')
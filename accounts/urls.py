@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from requests.asyncread import async_view
+from . import async_views, views
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
@@ -7,5 +9,9 @@ urlpatterns = [
     path('register/', views.register_view, name='register'),
     path('logout/', views.logout_view, name='logout'),
     path('profile/', views.profile_view, name='profile'),
+    path('cache-stats/', views.auth_cache_stats, name='auth_cache_stats'),
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns.insert(0, path('profile/', async_view(async_views.profile, views.profile_view)))
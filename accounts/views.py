@@ -1,8 +1,10 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from requests.permissions import IsAdmin
+from . import authentication
 from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
 
 
@@ -10,7 +12,7 @@ from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
 @authentication_classes([])
 @permission_classes([AllowAny])
 def login_view(request):
-    serializer = LoginSerializer(data=request.data)
+    serializer = LoginSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         user = serializer.validated_data['user']
         refresh = RefreshToken.for_user(user)
@@ -50,6 +52,13 @@ def profile_view(request):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def auth_cache_stats(request):
+    """Hits and misses of this worker process's authenticated-user cache"""
+    return Response(authentication.stats())
+
+
 @api_view(['POST'])
 def logout_view(request):
     try:
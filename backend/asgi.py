@@ -2,6 +2,8 @@
 ASGI config for procure-to-pay backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by gunicorn with uvicorn workers in docker-compose.asgi.yml, with
+ASYNC_READ_VIEWS=True so the read endpoints use the async views.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -87,12 +89,66 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# PostgreSQL when DB_ENGINE=postgresql or DB_HOST is set (as docker-compose
+# does), SQLite otherwise.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'postgresql' if os.environ.get('DB_HOST') else 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'procure_pay'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Reuse connections across requests, checked before each reuse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),  # seconds
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+            },
+        }
     }
-}
+    if os.environ.get('DB_POOL', 'False') == 'True':
+        # psycopg 3 connection pool, shared by the threads of a worker process;
+        # it replaces persistent connections, so CONN_MAX_AGE must be 0
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),  # seconds to wait for a connection
+        }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+    # Single-node profile for several worker processes sharing the file
+    SQLITE_TUNED_OPTIONS = {
+        # Wait this long for the write lock instead of failing with "database is locked"
+        'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),  # seconds
+        # Take the write lock when atomic() starts, so two writers never both
+        # hold read locks and fail on upgrading them. This applies to every
+        # atomic() block, so read-only ones also wait for the write lock.
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'  # readers and the writer don't block each other
+            'PRAGMA synchronous=NORMAL;'  # fsync at checkpoints only; safe with WAL
+            'PRAGMA cache_size=-20000;'  # 20 MB page cache per connection
+            'PRAGMA mmap_size=134217728;'  # 128 MB memory-mapped reads
+            'PRAGMA temp_store=MEMORY;'
+        ),
+    }
+    # Off by default for the bundled db.sqlite3: WAL mode is written into the
+    # file, so tuning it would rewrite the committed database
+    default_tuning = 'True' if os.environ.get('SQLITE_PATH') else 'False'
+    if os.environ.get('SQLITE_TUNING', default_tuning) == 'True':
+        DATABASES['default']['OPTIONS'] = SQLITE_TUNED_OPTIONS
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'postgresql' or 'sqlite', not {DB_ENGINE!r}")
 
 
 # Password validation
@@ -147,7 +203,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -190,6 +246,19 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Authenticated users are cached per token user id for this many seconds
+# (0 disables it); saving or deleting a user drops its entry
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 15))
+AUTH_USER_CACHE = os.environ.get('AUTH_USER_CACHE', 'default')  # alias in CACHES
+
+# Login by username or email with a single lookup and password hash
+AUTHENTICATION_BACKENDS = ['accounts.backends.EmailOrUsernameBackend']
+
+# Failed logins allowed per account (or unknown identifier) and client address within the window
+# before further attempts are refused without hashing (0 disables the limit)
+LOGIN_FAILURE_LIMIT = int(os.environ.get('LOGIN_FAILURE_LIMIT', 5))
+LOGIN_FAILURE_WINDOW = int(os.environ.get('LOGIN_FAILURE_WINDOW', 300))
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -202,4 +271,42 @@ CORS_ALLOW_CREDENTIALS = True
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
\ No newline at end of file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
+
+# Document Jobs (proforma extraction worker)
+DOCUMENT_JOB_MAX_ATTEMPTS = int(os.environ.get('DOCUMENT_JOB_MAX_ATTEMPTS', 3))
+DOCUMENT_JOB_STALE_AFTER = int(os.environ.get('DOCUMENT_JOB_STALE_AFTER', 600))  # seconds
+
+# Transactional outbox (run_outbox_dispatcher): events per claim, tries per
+# event, retry backoff doubling from OUTBOX_RETRY_DELAY up to the max, seconds
+# before a claimed event counts as abandoned, and days done events are kept
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+OUTBOX_RETRY_DELAY = float(os.environ.get('OUTBOX_RETRY_DELAY', 5))  # seconds
+OUTBOX_RETRY_MAX_DELAY = float(os.environ.get('OUTBOX_RETRY_MAX_DELAY', 600))  # seconds
+OUTBOX_STALE_AFTER = int(os.environ.get('OUTBOX_STALE_AFTER', 300))  # seconds
+OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', 7))
+
+# Extraction cache (keyed by SHA-256 of the uploaded file)
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get('EXTRACTION_CACHE_MAX_ENTRIES', 5000))
+
+# PDF text extraction
+PDF_EXTRACTION_WORKERS = int(os.environ.get('PDF_EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+PDF_EXTRACTION_MAX_PAGES = int(os.environ.get('PDF_EXTRACTION_MAX_PAGES', 500))
+PDF_EXTRACTION_MAX_MEMORY_MB = int(os.environ.get('PDF_EXTRACTION_MAX_MEMORY_MB', 1024))  # growth per extracting process
+PDF_PARALLEL_MIN_PAGES = 8  # smaller documents are extracted in-process
+PDF_EXTRACTION_CHUNK_PAGES = 4  # minimum pages per pool task
+
+# Bulk purchase request creation
+BULK_CREATE_MAX_REQUESTS = int(os.environ.get('BULK_CREATE_MAX_REQUESTS', 1000))
+BULK_CREATE_BATCH_SIZE = 500  # rows per INSERT statement
+
+# Serve JSON list endpoints from values() rows instead of serializer instances
+FAST_READ_SERIALIZATION = os.environ.get('FAST_READ_SERIALIZATION', 'True') == 'True'
+
+# Answer plain JSON reads of the list/detail, approval, finance and profile
+# endpoints from native async views; for ASGI deployments (see asgi.py)
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'False') == 'True'
+
+# Finance exports stream rows from the database this many at a time
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
\ No newline at end of file
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import DocumentJob, ExtractionCacheEntry
+
+
+@admin.register(DocumentJob)
+class DocumentJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'purchase_request', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'created_at')
+    search_fields = ('purchase_request__title', 'file_name')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(ExtractionCacheEntry)
+class ExtractionCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('file_hash', 'kind', 'parser_version', 'hit_count', 'created_at', 'last_used_at')
+    list_filter = ('kind', 'parser_version')
+    search_fields = ('file_hash',)
+    readonly_fields = ('created_at', 'last_used_at')
@@ -0,0 +1,49 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.services import parsing
+
+VENDORS = ['Acme Supplies', 'Global Electronics', 'Office Supplies Inc']
+PRODUCTS = ['Laptop Computer', 'Office Chair', 'Printer Paper (500 sheets)', 'Wireless Router', 'Whiteboard']
+
+
+class Command(BaseCommand):
+    help = 'Measure proforma and receipt parser throughput (lines/second) on a large synthetic document'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=500000,
+                            help='Lines in the synthetic document')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per parser (best run is reported)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        lines = self.build_document(options['lines'], random.Random(options['seed']))
+        self.stdout.write(f'Parsing {len(lines)} lines...')
+
+        self.stdout.write('='*50)
+        for name, parse in [('proforma', parsing.parse_proforma), ('receipt', parsing.parse_receipt)]:
+            best = min(self.time_run(parse, lines) for _ in range(options['repeat']))
+            self.stdout.write(f'{name:<10} {best:8.3f}s  {len(lines) / best:>14,.0f} lines/s')
+        self.stdout.write('='*50)
+
+    def build_document(self, count, rng):
+        lines = [rng.choice(VENDORS), '12 Market Street', '']
+        while len(lines) < count:
+            roll = rng.random()
+            if roll < 0.6:
+                lines.append(f'{rng.choice(PRODUCTS)} x{rng.randint(1, 9)} ${rng.randint(1, 2000)}.{rng.randint(0, 99):02d}')
+            elif roll < 0.65:
+                lines.append(f'Subtotal {rng.randint(100, 9000)}.00')
+            elif roll < 0.8:
+                lines.append('')
+            else:
+                lines.append('Thank you for your business')
+        return lines
+
+    def time_run(self, parse, lines):
+        start = time.perf_counter()
+        parse(iter(lines))
+        return time.perf_counter() - start
@@ -0,0 +1,71 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from documents.services import pdf_engine
+from .benchmark_parser import PRODUCTS, VENDORS
+
+
+def write_sample_pdf(path, pages, rng, lines_per_page=40):
+    """A proforma-like PDF: a vendor header, then item lines on every page"""
+    pdf = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+    for page in range(pages):
+        y = height - 50
+        if page == 0:
+            pdf.drawString(50, y, rng.choice(VENDORS))
+            y -= 15
+        for _ in range(lines_per_page):
+            pdf.drawString(50, y, f'{rng.choice(PRODUCTS)} x{rng.randint(1, 9)} ${rng.randint(1, 2000)}.{rng.randint(0, 99):02d}')
+            y -= 15
+        pdf.drawString(50, 30, f'Page {page + 1}')
+        pdf.showPage()
+    pdf.save()
+
+
+class Command(BaseCommand):
+    help = 'Compare sequential and page-parallel PDF text extraction on a generated multi-page PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=200,
+                            help='Pages in the generated PDF')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Extraction processes for the parallel run')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed runs per mode (median is reported)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.pdf')
+            write_sample_pdf(path, options['pages'], random.Random(options['seed']))
+            # Start the pool outside the timed runs, as a long-running worker would
+            pdf_engine.get_pool(options['workers'])
+
+            results = {}
+            for name, workers in [('sequential', 1), ('parallel', options['workers'])]:
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    texts = list(pdf_engine.iter_page_text(path, max_pages=0, workers=workers))
+                    timings.append(time.perf_counter() - start)
+                results[name] = (statistics.median(timings), texts)
+
+        sequential, expected = results['sequential']
+        parallel, actual = results['parallel']
+        if actual != expected:
+            raise CommandError('Parallel extraction returned different text')
+
+        self.stdout.write('='*60)
+        self.stdout.write(f"PDF EXTRACTION ({options['pages']} pages, {options['workers']} workers)")
+        self.stdout.write('='*60)
+        for name, (seconds, _) in results.items():
+            self.stdout.write(f"{name:<12}{seconds:>10.2f}s{options['pages'] / seconds:>12.1f} pages/s")
+        self.stdout.write(f'{"speedup":<12}{sequential / parallel:>10.1f}x')
+        self.stdout.write('='*60)
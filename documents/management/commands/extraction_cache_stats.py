@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from documents.models import ExtractionCacheEntry
+from documents.services import cache
+
+
+class Command(BaseCommand):
+    help = 'Show extraction cache usage, optionally evicting or clearing entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evict', action='store_true',
+                            help='Trim the cache to EXTRACTION_CACHE_MAX_ENTRIES')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete every cached extraction result')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = ExtractionCacheEntry.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} cache entries'))
+            return
+        if options['evict']:
+            self.stdout.write(f'Evicted {cache.evict()} cache entries')
+
+        rows = (
+            ExtractionCacheEntry.objects.values('kind', 'parser_version')
+            .annotate(entries=Count('id'), hits=Sum('hit_count'))
+            .order_by('kind', 'parser_version')
+        )
+        self.stdout.write('='*50)
+        self.stdout.write('EXTRACTION CACHE:')
+        self.stdout.write('='*50)
+        for row in rows:
+            self.stdout.write(
+                f"{row['kind']} v{row['parser_version']}: {row['entries']} entries, {row['hits']} hits"
+            )
+        self.stdout.write(f"Total entries: {cache.stats()['entries']}")
+        self.stdout.write('='*50)
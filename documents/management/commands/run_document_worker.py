@@ -0,0 +1,82 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from documents.services import jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued document jobs (proforma extraction, PO generation) with a local process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (1 runs jobs in this process)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Jobs claimed per round (defaults to twice the worker count)')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        batch_size = options['batch_size'] or workers * 2
+        worker_id = jobs.new_worker_id()
+
+        # Forked pool processes must not inherit open database connections.
+        connections.close_all()
+
+        self.stdout.write(f'Document worker {worker_id} started with {workers} processes')
+        processed = 0
+        # Jobs go to the process pool, except large PDFs: those run on threads
+        # of this process so the extraction engine can split them by page
+        # (which it won't do inside a pool process). With one worker every
+        # job runs here.
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            # Fork the pool processes now, before this process starts threads
+            pool.submit(os.getpid).result()
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            while True:
+                close_old_connections()
+                jobs.requeue_stale_jobs()
+                claimed = jobs.claim_jobs(worker_id, batch_size)
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                futures = {}
+                for job in claimed:
+                    try:
+                        outcome, payload = jobs.plan_job(job)
+                        if outcome == 'done':
+                            jobs.complete_job(job, payload, from_pool=False)
+                            self.stdout.write(f'Job {job.id} ({job.kind}) reused existing output')
+                            processed += 1
+                            continue
+                    except Exception as e:
+                        jobs.fail_job(job, e)
+                        continue
+                    func, args = payload
+                    executor = pool if outcome == 'run' and pool is not None else threads
+                    futures[executor.submit(func, *args)] = job
+
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        jobs.complete_job(job, future.result())
+                        self.stdout.write(f'Job {job.id} ({job.kind}) succeeded')
+                    except Exception as e:
+                        jobs.fail_job(job, e)
+                        self.stdout.write(self.style.ERROR(f'Job {job.id} ({job.kind}) failed: {e}'))
+                    processed += 1
+        if pool is not None:
+            pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 15:11
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractionCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_hash', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('proforma', 'Proforma'), ('receipt', 'Receipt')], max_length=20)),
+                ('parser_version', models.CharField(max_length=20)),
+                ('result', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Extraction cache entries',
+                'unique_together': {('file_hash', 'kind', 'parser_version')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_extractioncacheentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentjob',
+            name='kind',
+            field=models.CharField(choices=[('proforma_extraction', 'Proforma Extraction'), ('purchase_order', 'Purchase Order Generation')], max_length=50),
+        ),
+    ]
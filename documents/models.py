@@ -0,0 +1,68 @@
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+class DocumentJob(models.Model):
+    KIND_CHOICES = [
+        ('proforma_extraction', 'Proforma Extraction'),
+        ('purchase_order', 'Purchase Order Generation'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued'
+    )
+    purchase_request = models.ForeignKey(
+        'requests.PurchaseRequest',
+        on_delete=models.CASCADE,
+        related_name='document_jobs'
+    )
+    file_name = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    locked_by = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.id} - {self.status}"
+
+
+class ExtractionCacheEntry(models.Model):
+    KIND_CHOICES = [
+        ('proforma', 'Proforma'),
+        ('receipt', 'Receipt'),
+    ]
+
+    file_hash = models.CharField(max_length=64)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    parser_version = models.CharField(max_length=20)
+    result = models.JSONField(encoder=DjangoJSONEncoder)
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        unique_together = ['file_hash', 'kind', 'parser_version']
+        verbose_name_plural = 'Extraction cache entries'
+
+    def __str__(self):
+        return f"{self.kind} {self.file_hash[:12]} (v{self.parser_version})"
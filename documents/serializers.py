@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .models import DocumentJob
 
 
 class ProformaExtractionSerializer(serializers.Serializer):
@@ -26,4 +27,14 @@ class PurchaseOrderDataSerializer(serializers.Serializer):
     items = serializers.ListField()
     total_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     request_id = serializers.IntegerField()
-    created_by = serializers.CharField()
\ No newline at end of file
+    created_by = serializers.CharField()
+
+
+class DocumentJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DocumentJob
+        fields = [
+            'id', 'kind', 'status', 'purchase_request', 'result', 'error',
+            'attempts', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
\ No newline at end of file
@@ -0,0 +1,125 @@
+import hashlib
+import os
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from documents.models import ExtractionCacheEntry
+
+# Per-process counters; persistent per-entry hits live on ExtractionCacheEntry
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+DECIMAL_KEYS = ('total_amount', 'price')
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """SHA-256 of the file contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _restore_decimals(value):
+    """JSON storage turns Decimals into strings; convert the money fields back"""
+    if isinstance(value, dict):
+        return {
+            key: Decimal(val) if key in DECIMAL_KEYS and isinstance(val, (str, int, float)) else _restore_decimals(val)
+            for key, val in value.items()
+        }
+    if isinstance(value, list):
+        return [_restore_decimals(val) for val in value]
+    return value
+
+
+def _lookup(kind, parser_version, digest):
+    entry = ExtractionCacheEntry.objects.filter(
+        file_hash=digest, kind=kind, parser_version=parser_version
+    ).only('id', 'result').first()
+    if entry is None:
+        _stats['misses'] += 1
+        return None
+
+    _stats['hits'] += 1
+    ExtractionCacheEntry.objects.filter(id=entry.id).update(
+        hit_count=F('hit_count') + 1,
+        last_used_at=timezone.now()
+    )
+    return _restore_decimals(entry.result)
+
+
+def is_empty(result):
+    """Whether an extraction found nothing: no vendor, no items and no total.
+
+    The extractors catch their own errors and return the parse of no text,
+    so this is how a corrupt file or a transient pdfplumber/tesseract error
+    shows up.
+    """
+    return not result or not (result.get('vendor_name') or result.get('items') or result.get('total_amount'))
+
+
+def _store(kind, parser_version, digest, result):
+    # Empty results usually mean the extractor failed; don't pin them, so the
+    # next upload of the same bytes is extracted again
+    if is_empty(result):
+        return
+    try:
+        with transaction.atomic():
+            ExtractionCacheEntry.objects.create(
+                file_hash=digest, kind=kind, parser_version=parser_version, result=result
+            )
+    except IntegrityError:
+        # Another process cached the same file first
+        return
+    evict()
+
+
+def evict():
+    """Drop least recently used entries beyond EXTRACTION_CACHE_MAX_ENTRIES"""
+    max_entries = settings.EXTRACTION_CACHE_MAX_ENTRIES
+    stale_ids = list(
+        ExtractionCacheEntry.objects.order_by('-last_used_at')
+        .values_list('id', flat=True)[max_entries:]
+    )
+    if stale_ids:
+        ExtractionCacheEntry.objects.filter(id__in=stale_ids).delete()
+        _stats['evictions'] += len(stale_ids)
+    return len(stale_ids)
+
+
+def lookup(kind, parser_version, file_path):
+    """Return the cached extraction result for this file, or None"""
+    return _lookup(kind, parser_version, file_digest(file_path))
+
+
+def store(kind, parser_version, file_path, result):
+    _store(kind, parser_version, file_digest(file_path), result)
+
+
+def cached_extraction(kind, parser_version, file_path, extractor):
+    """Run `extractor(file_path)` unless an identical file was already extracted"""
+    if not os.path.exists(file_path):
+        return extractor(file_path)
+
+    digest = file_digest(file_path)
+    result = _lookup(kind, parser_version, digest)
+    if result is None:
+        result = extractor(file_path)
+        _store(kind, parser_version, digest, result)
+    return result
+
+
+def stats():
+    """Hit/miss counters for this process plus persisted cache totals"""
+    totals = ExtractionCacheEntry.objects.aggregate(total_hits=Sum('hit_count'))
+    requests = _stats['hits'] + _stats['misses']
+    return {
+        **_stats,
+        'hit_rate': _stats['hits'] / requests if requests else 0.0,
+        'entries': ExtractionCacheEntry.objects.count(),
+        'persisted_hits': totals['total_hits'] or 0,
+    }
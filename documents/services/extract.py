@@ -1,9 +1,10 @@
-import pdfplumber
 import pytesseract
 from PIL import Image
 import os
-import re
-from decimal import Decimal
+from . import parsing, pdf_engine
+
+# Bump when parsing changes so cached extraction results are recomputed
+PARSER_VERSION = '2'
 
 
 def extract_proforma_data(file_path):
@@ -23,45 +24,12 @@ def extract_proforma_data(file_path):
 
 def extract_from_pdf(file_path):
     """Extract text from PDF using pdfplumber"""
-    extracted_data = {
-        'vendor_name': '',
-        'vendor_address': '',
-        'items': [],
-        'total_amount': Decimal('0.00')
-    }
-
     try:
-        with pdfplumber.open(file_path) as pdf:
-            text = ''
-            for page in pdf.pages:
-                text += page.extract_text() + '\n'
-
-            # Parse the text
-            lines = text.split('\n')
-            vendor_found = False
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Look for vendor name (usually at the top)
-                if not vendor_found and len(line.split()) <= 5 and not any(char.isdigit() for char in line):
-                    extracted_data['vendor_name'] = line
-                    vendor_found = True
-                    continue
-
-                # Look for items (lines with prices)
-                if '$' in line or 'USD' in line or re.search(r'\d+\.\d{2}', line):
-                    item_data = parse_item_line(line)
-                    if item_data:
-                        extracted_data['items'].append(item_data)
-                        extracted_data['total_amount'] += item_data.get('price', Decimal('0.00'))
-
+        # Lines are streamed page by page from the extraction engine
+        return parsing.parse_proforma(pdf_engine.iter_lines(file_path))
     except Exception as e:
         print(f"Error extracting from PDF: {e}")
-
-    return extracted_data
+        return parsing.parse_proforma([])
 
 
 def extract_from_image(file_path):
@@ -69,7 +37,7 @@ def extract_from_image(file_path):
     try:
         image = Image.open(file_path)
         text = pytesseract.image_to_string(image)
-        # Similar parsing as PDF
+        # Same parsing as PDF
         return extract_from_pdf_text(text)
     except Exception as e:
         print(f"Error extracting from image: {e}")
@@ -78,33 +46,9 @@ def extract_from_image(file_path):
 
 def extract_from_pdf_text(text):
     """Parse extracted text for proforma data"""
-    extracted_data = {
-        'vendor_name': '',
-        'vendor_address': '',
-        'items': [],
-        'total_amount': Decimal('0.00')
-    }
-
-    lines = text.split('\n')
-    for line in lines:
-        # Similar logic as PDF extraction
-        pass
-
-    return extracted_data
+    return parsing.parse_proforma(text.splitlines())
 
 
 def parse_item_line(line):
     """Parse a line containing item information"""
-    # Simple regex to find item name and price
-    # This is a basic implementation - would need refinement for real use
-    price_match = re.search(r'(\d+\.\d{2})', line)
-    if price_match:
-        price = Decimal(price_match.group(1))
-        # Assume everything before price is item name
-        item_name = line[:price_match.start()].strip()
-        return {
-            'item_name': item_name,
-            'price': price,
-            'quantity': 1
-        }
-    return None
\ No newline at end of file
+    return parsing.proforma_item(line, parsing.PRICE_RE.search(line))
@@ -0,0 +1,161 @@
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from documents.models import DocumentJob
+from requests.models import PurchaseRequest
+from . import cache, extract, pdf_engine, po_generator
+
+
+def enqueue_proforma_extraction(purchase_request):
+    """Queue OCR/text extraction of the request's proforma file"""
+    return DocumentJob.objects.create(
+        kind='proforma_extraction',
+        purchase_request=purchase_request,
+        file_name=purchase_request.proforma_file.name
+    )
+
+
+def enqueue_purchase_order(purchase_request):
+    """Queue PO generation unless the request already has a PO or a pending job"""
+    if PurchaseRequest.objects.filter(id=purchase_request.id, purchase_order_file__gt='').exists():
+        return None
+    pending = DocumentJob.objects.filter(
+        kind='purchase_order',
+        purchase_request_id=purchase_request.id,
+        status__in=['queued', 'running']
+    ).first()
+    if pending is not None:
+        return pending
+    return DocumentJob.objects.create(kind='purchase_order', purchase_request=purchase_request)
+
+
+def enqueue_purchase_orders(request_ids):
+    """Bulk variant of enqueue_purchase_order for requests approved together"""
+    pending = set(
+        DocumentJob.objects.filter(
+            kind='purchase_order',
+            purchase_request_id__in=request_ids,
+            status__in=['queued', 'running']
+        ).values_list('purchase_request_id', flat=True)
+    )
+    issued = set(
+        PurchaseRequest.objects.filter(id__in=request_ids, purchase_order_file__gt='')
+        .values_list('id', flat=True)
+    )
+    return DocumentJob.objects.bulk_create([
+        DocumentJob(kind='purchase_order', purchase_request_id=request_id)
+        for request_id in request_ids
+        if request_id not in pending and request_id not in issued
+    ])
+
+
+def new_worker_id():
+    """Identifier stored on the jobs a worker claims"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def claim_jobs(worker_id, limit):
+    """Atomically move up to `limit` queued jobs to running for this worker"""
+    with transaction.atomic():
+        ids = list(
+            DocumentJob.objects.select_for_update(skip_locked=True)
+            .filter(status='queued')
+            .order_by('created_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # The status condition keeps two workers from claiming the same job on
+        # backends without SELECT ... FOR UPDATE (SQLite).
+        DocumentJob.objects.filter(id__in=ids, status='queued').update(
+            status='running',
+            locked_by=worker_id,
+            started_at=timezone.now()
+        )
+    return list(
+        DocumentJob.objects.select_related('purchase_request__created_by')
+        .filter(id__in=ids, status='running', locked_by=worker_id)
+    )
+
+
+def requeue_stale_jobs():
+    """Return jobs whose worker died mid-run to the queue"""
+    cutoff = timezone.now() - timedelta(seconds=settings.DOCUMENT_JOB_STALE_AFTER)
+    return DocumentJob.objects.filter(
+        status='running',
+        started_at__lt=cutoff
+    ).update(status='queued', locked_by='')
+
+
+def plan_job(job):
+    """Decide how to run a claimed job.
+
+    Returns ('done', result) when the output already exists (an identical
+    file was extracted before, or an identical PO was rendered), otherwise
+    ('run', (callable, args)) for the process pool. Only plain, picklable
+    arguments are handed to the pool so worker processes never touch the
+    database. PDFs large enough to split by page return ('fan_out', (callable,
+    args)) instead: they run in the worker's own process, where the
+    extraction engine spreads their pages over its pool (see pdf_engine).
+    """
+    if job.kind == 'proforma_extraction':
+        path = default_storage.path(job.file_name)
+        cached = cache.lookup('proforma', extract.PARSER_VERSION, path) if os.path.exists(path) else None
+        if cached is not None:
+            return 'done', cached
+        outcome = 'fan_out' if pdf_engine.fans_out(path) else 'run'
+        return outcome, (extract.extract_proforma_data, (path,))
+
+    if job.kind == 'purchase_order':
+        context = po_generator.build_po_context(job.purchase_request)
+        job.file_name = po_generator.po_file_name(context)
+        if default_storage.exists(job.file_name):
+            return 'done', {'file': job.file_name}
+        return 'run', (po_generator.render_po_pdf, (context,))
+
+    raise ValueError(f'Unknown job kind: {job.kind}')
+
+
+def complete_job(job, result, from_pool=True):
+    """Store the output of a job; `result` is the pool output or the plan_job result"""
+    if job.kind == 'proforma_extraction' and from_pool:
+        path = default_storage.path(job.file_name)
+        if os.path.exists(path):
+            cache.store('proforma', extract.PARSER_VERSION, path, result)
+
+    if job.kind == 'purchase_order':
+        file_name = po_generator.save_po(job.file_name, result) if from_pool else result['file']
+        # update() skips auto_now; bump updated_at so the request's ETags change
+        PurchaseRequest.objects.filter(id=job.purchase_request_id).update(
+            purchase_order_file=file_name,
+            updated_at=timezone.now()
+        )
+        job.file_name = file_name
+        result = {'file': file_name}
+
+    job.status = 'succeeded'
+    job.result = result
+    job.error = ''
+    job.attempts += 1
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file_name', 'result', 'error', 'attempts', 'finished_at'])
+
+
+def fail_job(job, error):
+    """Record a failure, re-queueing the job until it runs out of attempts"""
+    job.attempts += 1
+    job.error = str(error)
+    if job.attempts >= settings.DOCUMENT_JOB_MAX_ATTEMPTS:
+        job.status = 'failed'
+        job.finished_at = timezone.now()
+    else:
+        job.status = 'queued'
+        job.locked_by = ''
+    job.save(update_fields=['status', 'error', 'attempts', 'locked_by', 'finished_at'])
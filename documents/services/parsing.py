@@ -0,0 +1,91 @@
+import re
+from decimal import Decimal
+
+# Compiled once; each line is scanned for a price exactly one time
+PRICE_RE = re.compile(r'(\d+\.\d{2})')
+DIGIT_RE = re.compile(r'\d')
+TOTAL_RE = re.compile(r'total', re.IGNORECASE)
+
+
+def tokenize(lines):
+    """Yield (line, price_match) for every non-empty line of a line stream"""
+    search = PRICE_RE.search
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield line, search(line)
+
+
+def proforma_item(line, price_match):
+    """Build a proforma item from a line and its price match"""
+    if price_match is None:
+        return None
+    return {
+        'item_name': line[:price_match.start()].strip(),
+        'price': Decimal(price_match.group(1)),
+        'quantity': 1
+    }
+
+
+def receipt_item(line, price_match):
+    """Build a receipt item from a line and its price match"""
+    if price_match is None:
+        return None
+    return {
+        'name': line[:price_match.start()].strip(),
+        'price': Decimal(price_match.group(1))
+    }
+
+
+def parse_proforma(lines):
+    """Parse proforma text lines in a single pass.
+
+    The vendor is the first short line without digits; every later line
+    carrying a price becomes an item.
+    """
+    extracted_data = {
+        'vendor_name': '',
+        'vendor_address': '',
+        'items': [],
+        'total_amount': Decimal('0.00')
+    }
+    items = extracted_data['items']
+    total = Decimal('0.00')
+    vendor_found = False
+
+    for line, price_match in tokenize(lines):
+        if not vendor_found and price_match is None and not DIGIT_RE.search(line) and len(line.split()) <= 5:
+            extracted_data['vendor_name'] = line
+            vendor_found = True
+            continue
+
+        if price_match is not None:
+            item = proforma_item(line, price_match)
+            items.append(item)
+            total += item['price']
+
+    extracted_data['total_amount'] = total
+    return extracted_data
+
+
+def parse_receipt(lines):
+    """Parse receipt text lines in a single pass.
+
+    Lines mentioning a total set the receipt amount (the last one wins);
+    other priced lines with more than two words become items.
+    """
+    extracted_data = {
+        'vendor_name': '',
+        'items': [],
+        'total_amount': Decimal('0.00')
+    }
+    items = extracted_data['items']
+
+    for line, price_match in tokenize(lines):
+        if TOTAL_RE.search(line):
+            if price_match is not None:
+                extracted_data['total_amount'] = Decimal(price_match.group(1))
+        elif price_match is not None and len(line.split()) > 2:
+            items.append(receipt_item(line, price_match))
+
+    return extracted_data
@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import pdfplumber
+from django.conf import settings
+from pdfminer.pdftypes import resolve1
+
+
+class PDFTooLarge(Exception):
+    """Raised when a PDF exceeds the configured page or memory limits"""
+
+
+# One pool per process, started on first use and kept for later documents.
+# Its processes are spawned, so they don't inherit the parent's database
+# connections or threads.
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+@contextmanager
+def in_process():
+    """Extract on the calling thread inside the block (used by request handlers,
+    so an HTTP request never fans out into extraction processes)"""
+    previous = getattr(_local, 'in_process', False)
+    _local.in_process = True
+    try:
+        yield
+    finally:
+        _local.in_process = previous
+
+
+def parallel_allowed():
+    """False in pool worker processes (e.g. run_document_worker's) and inside in_process()"""
+    return multiprocessing.parent_process() is None and not getattr(_local, 'in_process', False)
+
+
+def get_pool(workers):
+    """The process's extraction pool, grown when a caller asks for more workers"""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_size = workers
+        return _pool
+
+
+def reset_pool():
+    """Drop a broken pool so the next document starts a fresh one"""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool, _pool_size = None, 0
+
+
+def fans_out(file_path):
+    """Whether iter_page_text() would split this file across the pool when
+    called from a process and thread where that is allowed"""
+    if settings.PDF_EXTRACTION_WORKERS <= 1 or not file_path.lower().endswith('.pdf'):
+        return False
+    try:
+        return page_count(file_path) >= settings.PDF_PARALLEL_MIN_PAGES
+    except Exception:
+        return False
+
+
+def page_count(file_path):
+    """Number of pages, read from the document catalog without building pages"""
+    with pdfplumber.open(file_path) as pdf:
+        try:
+            return int(resolve1(pdf.doc.catalog['Pages'])['Count'])
+        except (KeyError, TypeError, ValueError):
+            return len(pdf.pages)
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def check_memory(max_memory_mb, baseline_mb):
+    """Raise once this process grew by more than max_memory_mb since baseline_mb,
+    so a worker that was already large before extraction isn't refused"""
+    if not max_memory_mb or baseline_mb is None:
+        return
+    rss = current_rss_mb()
+    if rss is not None and rss - baseline_mb > max_memory_mb:
+        raise PDFTooLarge(
+            f'PDF extraction exceeded {max_memory_mb} MB (grew by {rss - baseline_mb:.0f} MB)'
+        )
+
+
+def extract_page_range(file_path, start, stop, max_memory_mb=None):
+    """Text of pages [start, stop), releasing each page's layout cache as it goes.
+
+    Runs in pool workers, so it only takes and returns plain values.
+    """
+    baseline = current_rss_mb()
+    texts = []
+    # pdfplumber only builds Page objects for the requested (1-based) pages
+    with pdfplumber.open(file_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or '')
+            page.flush_cache()
+            check_memory(max_memory_mb, baseline)
+    return texts
+
+
+def _extract_chunk(args):
+    return extract_page_range(*args)
+
+
+def iter_page_text(file_path, max_pages=None, max_memory_mb=None, workers=None):
+    """Yield the text of each page in order.
+
+    Documents with at least PDF_PARALLEL_MIN_PAGES pages are split into
+    contiguous chunks extracted across a process pool; chunks are yielded as
+    soon as they (and every chunk before them) are done, so the caller can
+    parse page text while later pages are still being extracted. Limits
+    left as None come from settings; 0 disables a limit.
+    """
+    if max_pages is None:
+        max_pages = settings.PDF_EXTRACTION_MAX_PAGES
+    if max_memory_mb is None:
+        max_memory_mb = settings.PDF_EXTRACTION_MAX_MEMORY_MB
+    if workers is None:
+        workers = settings.PDF_EXTRACTION_WORKERS
+    if not parallel_allowed():
+        workers = 1
+
+    total = page_count(file_path)
+    if max_pages and total > max_pages:
+        raise PDFTooLarge(f'PDF has {total} pages (limit {max_pages})')
+
+    if workers <= 1 or total < settings.PDF_PARALLEL_MIN_PAGES:
+        baseline = current_rss_mb()
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ''
+                page.flush_cache()
+                check_memory(max_memory_mb, baseline)
+        return
+
+    # Every chunk re-opens the file, so aim for about two chunks per worker
+    chunk = max(settings.PDF_EXTRACTION_CHUNK_PAGES, -(-total // (workers * 2)))
+    chunks = [
+        (file_path, start, min(start + chunk, total), max_memory_mb)
+        for start in range(0, total, chunk)
+    ]
+    try:
+        for texts in get_pool(workers).map(_extract_chunk, chunks):
+            yield from texts
+    except BrokenProcessPool:
+        reset_pool()
+        raise
+
+
+def iter_lines(file_path, **limits):
+    """Yield the stripped, non-empty text lines of a PDF, page by page"""
+    for text in iter_page_text(file_path, **limits):
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                yield line
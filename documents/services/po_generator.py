@@ -1,6 +1,9 @@
+import hashlib
+import json
+from functools import lru_cache
+
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -9,77 +12,108 @@ from io import BytesIO
 from requests.models import PurchaseRequest
 
 
-def generate_po(purchase_request):
-    """Generate a Purchase Order PDF from approved request"""
-    if not isinstance(purchase_request, PurchaseRequest):
-        return None
+@lru_cache(maxsize=1)
+def get_styles():
+    """Stylesheet and table styles, built once per process.
+
+    Table.setStyle copies the commands, so the same TableStyle objects can
+    be shared by every PO.
+    """
+    styles = getSampleStyleSheet()
+    details_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    items_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    return styles, details_style, items_style
 
+
+def build_po_context(purchase_request):
+    """Plain data needed to render the PO, loading the items with one query"""
+    items = purchase_request.items.all()
+    return {
+        'id': purchase_request.id,
+        'po_number': f'PO-{purchase_request.id:04d}',
+        'date': purchase_request.created_at.strftime('%Y-%m-%d'),
+        'vendor': purchase_request.vendor_name or 'Extracted from Proforma',
+        'requested_by': purchase_request.created_by.get_full_name(),
+        'amount': f'${purchase_request.amount}',
+        'items': [
+            [item.item_name, str(item.quantity), f'${item.price}', f'${item.total}']
+            for item in items
+        ],
+    }
+
+
+def po_file_name(context):
+    """Storage path keyed on the PO content, so unchanged requests reuse their PDF"""
+    digest = hashlib.sha256(json.dumps(context, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"purchase_orders/po_{context['id']}_{digest[:12]}.pdf"
+
+
+def render_po_pdf(context):
+    """Render the PO PDF and return its bytes (safe to run in a worker process)"""
+    styles, details_style, items_style = get_styles()
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
     story = []
 
     # Title
-    title = Paragraph("PURCHASE ORDER", styles['Title'])
-    story.append(title)
+    story.append(Paragraph("PURCHASE ORDER", styles['Title']))
     story.append(Spacer(1, 12))
 
     # PO Details
     po_data = [
-        ['PO Number:', f'PO-{purchase_request.id:04d}'],
-        ['Date:', purchase_request.created_at.strftime('%Y-%m-%d')],
-        ['Vendor:', 'Extracted from Proforma'],  # TODO: Use extracted vendor
-        ['Requested By:', purchase_request.created_by.get_full_name()],
-        ['Amount:', f'${purchase_request.amount}'],
+        ['PO Number:', context['po_number']],
+        ['Date:', context['date']],
+        ['Vendor:', context['vendor']],
+        ['Requested By:', context['requested_by']],
+        ['Amount:', context['amount']],
     ]
-
     po_table = Table(po_data, colWidths=[100, 300])
-    po_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    po_table.setStyle(details_style)
     story.append(po_table)
     story.append(Spacer(1, 20))
 
     # Items
-    if purchase_request.items.exists():
-        items_data = [['Item', 'Quantity', 'Price', 'Total']]
-        for item in purchase_request.items.all():
-            items_data.append([
-                item.item_name,
-                str(item.quantity),
-                f'${item.price}',
-                f'${item.total}'
-            ])
-
-        items_table = Table(items_data, colWidths=[200, 80, 80, 80])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+    if context['items']:
+        items_table = Table([['Item', 'Quantity', 'Price', 'Total']] + context['items'], colWidths=[200, 80, 80, 80])
+        items_table.setStyle(items_style)
         story.append(items_table)
 
     doc.build(story)
+    return buffer.getvalue()
+
 
-    # Save to file
-    buffer.seek(0)
-    file_name = f'po_{purchase_request.id}.pdf'
-    file_path = f'purchase_orders/{file_name}'
+def save_po(file_name, pdf_bytes):
+    """Store the rendered PDF unless an identical PO already exists"""
+    if default_storage.exists(file_name):
+        return file_name
+    return default_storage.save(file_name, ContentFile(pdf_bytes))
 
-    # Save file
-    file_content = ContentFile(buffer.getvalue())
-    saved_path = default_storage.save(file_path, file_content)
 
-    return saved_path
\ No newline at end of file
+def generate_po(purchase_request):
+    """Generate a Purchase Order PDF from approved request"""
+    if not isinstance(purchase_request, PurchaseRequest):
+        return None
+
+    context = build_po_context(purchase_request)
+    file_name = po_file_name(context)
+    if default_storage.exists(file_name):
+        return file_name
+    return save_po(file_name, render_po_pdf(context))
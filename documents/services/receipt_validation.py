@@ -1,9 +1,11 @@
-import pdfplumber
 import pytesseract
 from PIL import Image
 import os
-import re
 from decimal import Decimal
+from . import cache, parsing, pdf_engine
+
+# Bump when parsing changes so cached extraction results are recomputed
+PARSER_VERSION = '2'
 
 
 def validate_receipt(receipt_file, purchase_request):
@@ -20,8 +22,8 @@ def validate_receipt(receipt_file, purchase_request):
             'extracted_data': {}
         }
 
-    # Extract data from receipt
-    extracted_data = extract_receipt_data(file_path)
+    # Extract data from receipt (cached by file content)
+    extracted_data = cache.cached_extraction('receipt', PARSER_VERSION, file_path, extract_receipt_data)
 
     # Compare with PO
     discrepancies = []
@@ -73,41 +75,12 @@ def extract_receipt_data(file_path):
 
 def extract_receipt_from_pdf(file_path):
     """Extract receipt data from PDF"""
-    extracted_data = {
-        'vendor_name': '',
-        'items': [],
-        'total_amount': Decimal('0.00')
-    }
-
     try:
-        with pdfplumber.open(file_path) as pdf:
-            text = ''
-            for page in pdf.pages:
-                text += page.extract_text() + '\n'
-
-            # Parse receipt text
-            lines = text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Look for total
-                if 'total' in line.lower():
-                    amount_match = re.search(r'(\d+\.\d{2})', line)
-                    if amount_match:
-                        extracted_data['total_amount'] = Decimal(amount_match.group(1))
-
-                # Look for items
-                elif re.search(r'\d+\.\d{2}', line) and len(line.split()) > 2:
-                    item_data = parse_receipt_item_line(line)
-                    if item_data:
-                        extracted_data['items'].append(item_data)
-
+        # Parse receipt text as it streams from the extraction engine
+        return parsing.parse_receipt(pdf_engine.iter_lines(file_path))
     except Exception as e:
         print(f"Error extracting receipt from PDF: {e}")
-
-    return extracted_data
+        return parsing.parse_receipt([])
 
 
 def extract_receipt_from_image(file_path):
@@ -115,7 +88,7 @@ def extract_receipt_from_image(file_path):
     try:
         image = Image.open(file_path)
         text = pytesseract.image_to_string(image)
-        # Similar parsing logic
+        # Same parsing as PDF
         return extract_receipt_from_pdf_text(text)
     except Exception as e:
         print(f"Error extracting receipt from image: {e}")
@@ -124,28 +97,9 @@ def extract_receipt_from_image(file_path):
 
 def extract_receipt_from_pdf_text(text):
     """Parse receipt text"""
-    extracted_data = {
-        'vendor_name': '',
-        'items': [],
-        'total_amount': Decimal('0.00')
-    }
-
-    lines = text.split('\n')
-    for line in lines:
-        # Similar logic as PDF
-        pass
-
-    return extracted_data
+    return parsing.parse_receipt(text.splitlines())
 
 
 def parse_receipt_item_line(line):
     """Parse receipt item line"""
-    price_match = re.search(r'(\d+\.\d{2})', line)
-    if price_match:
-        price = Decimal(price_match.group(1))
-        name = line[:price_match.start()].strip()
-        return {
-            'name': name,
-            'price': price
-        }
-    return None
\ No newline at end of file
+    return parsing.receipt_item(line, parsing.PRICE_RE.search(line))
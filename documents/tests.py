@@ -0,0 +1,142 @@
+import io
+import os
+import random
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from requests.models import PurchaseRequest
+from .management.commands.benchmark_pdf_extraction import write_sample_pdf
+from .models import ExtractionCacheEntry
+from .services import cache, extract, jobs, pdf_engine, receipt_validation
+
+User = get_user_model()
+
+
+@override_settings(PDF_EXTRACTION_WORKERS=2, PDF_PARALLEL_MIN_PAGES=8, PDF_EXTRACTION_CHUNK_PAGES=2)
+class PageParallelExtractionTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, 'proforma.pdf')
+        write_sample_pdf(cls.path, 10, random.Random(1), lines_per_page=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        pdf_engine.reset_pool()
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def test_parallel_pages_match_sequential(self):
+        sequential = list(pdf_engine.iter_page_text(self.path, workers=1))
+        with mock.patch.object(pdf_engine, 'extract_page_range', wraps=pdf_engine.extract_page_range) as chunk:
+            parallel = list(pdf_engine.iter_page_text(self.path, workers=2))
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(len(parallel), 10)
+        self.assertTrue(parallel[-1].endswith('Page 10'))
+        # Chunks ran in the pool's processes, not through this module's function
+        chunk.assert_not_called()
+        self.assertIsNotNone(pdf_engine._pool)
+
+    def test_large_pdfs_fan_out_unless_in_process(self):
+        self.assertTrue(pdf_engine.fans_out(self.path))
+        with pdf_engine.in_process():
+            self.assertFalse(pdf_engine.parallel_allowed())
+        self.assertTrue(pdf_engine.parallel_allowed())
+
+    def test_zero_page_limit_means_no_limit(self):
+        self.assertEqual(len(list(pdf_engine.iter_page_text(self.path, max_pages=0, workers=1))), 10)
+        with self.assertRaises(pdf_engine.PDFTooLarge):
+            list(pdf_engine.iter_page_text(self.path, max_pages=5, workers=1))
+
+    def test_memory_limit_counts_growth_from_the_start_of_extraction(self):
+        rss = pdf_engine.current_rss_mb()
+        if rss is None:
+            self.skipTest('/proc is unavailable')
+        # A process already larger than the limit may still extract
+        pdf_engine.check_memory(1, rss)
+        with self.assertRaises(pdf_engine.PDFTooLarge):
+            pdf_engine.check_memory(1, rss - 10)
+
+
+@override_settings(PDF_EXTRACTION_WORKERS=2, PDF_PARALLEL_MIN_PAGES=8, PDF_EXTRACTION_CHUNK_PAGES=2)
+class DocumentWorkerTests(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.addCleanup(pdf_engine.reset_pool)
+        settings_override = override_settings(MEDIA_ROOT=self.media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.makedirs(os.path.join(self.media, 'proformas'))
+        write_sample_pdf(os.path.join(self.media, 'proformas', 'large.pdf'), 10, random.Random(2), lines_per_page=5)
+        owner = User.objects.create_user(username='staff', email='staff@example.com', password='x')
+        self.purchase_request = PurchaseRequest.objects.create(
+            title='Chairs', description='Meeting room', amount=Decimal('100.00'), created_by=owner,
+            proforma_file='proformas/large.pdf'
+        )
+
+    def test_large_proforma_is_planned_for_page_parallel_extraction(self):
+        job = jobs.enqueue_proforma_extraction(self.purchase_request)
+        outcome, _ = jobs.plan_job(job)
+        self.assertEqual(outcome, 'fan_out')
+
+    def test_inline_worker_extracts_large_proforma_across_the_pool(self):
+        job = jobs.enqueue_proforma_extraction(self.purchase_request)
+        call_command('run_document_worker', workers=1, once=True, stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded', job.error)
+        self.assertEqual(len(job.result['items']), 50)
+        self.assertIsNotNone(pdf_engine._pool)
+
+
+class ExtractionCacheTests(TestCase):
+    """Failed extractions are retried on the next upload instead of being cached"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.paths = []
+        for name in ('bad.pdf', 'bad.png'):
+            path = os.path.join(directory, name)
+            with open(path, 'wb') as f:
+                f.write(b'not a document ' + name.encode())
+            self.paths.append(path)
+
+    def extract_twice(self, kind, version, extractor, path):
+        calls = []
+
+        def counted(file_path):
+            calls.append(file_path)
+            return extractor(file_path)
+
+        for _ in range(2):
+            cache.cached_extraction(kind, version, path, counted)
+        return len(calls)
+
+    def test_failed_extractions_are_not_cached(self):
+        extractors = [
+            ('proforma', extract.PARSER_VERSION, extract.extract_proforma_data),
+            ('receipt', receipt_validation.PARSER_VERSION, receipt_validation.extract_receipt_data),
+        ]
+        for path in self.paths:
+            for kind, version, extractor in extractors:
+                with self.subTest(kind=kind, file=os.path.basename(path)):
+                    self.assertEqual(self.extract_twice(kind, version, extractor, path), 2)
+                    self.assertFalse(ExtractionCacheEntry.objects.exists())
+
+    def test_non_empty_results_are_cached(self):
+        def extractor(file_path):
+            return {'vendor_name': 'Acme Supplies', 'items': [], 'total_amount': 0}
+
+        self.assertEqual(self.extract_twice('receipt', 'test', extractor, self.paths[0]), 1)
+        self.assertEqual(ExtractionCacheEntry.objects.count(), 1)
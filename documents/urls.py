@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('requests/<int:request_id>/extract-proforma/', views.extract_proforma, name='extract_proforma'),
     path('requests/<int:request_id>/validate-receipt/', views.validate_receipt, name='validate_receipt'),
+    path('jobs/<int:job_id>/', views.job_status, name='document_job_status'),
 ]
\ No newline at end of file
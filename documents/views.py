@@ -3,8 +3,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from requests.models import PurchaseRequest
-from .serializers import ProformaExtractionSerializer, ReceiptValidationResultSerializer
-from .services import extract, receipt_validation
+from .models import DocumentJob
+from .serializers import ProformaExtractionSerializer, ReceiptValidationResultSerializer, DocumentJobSerializer
+from .services import cache, extract, pdf_engine, receipt_validation
 
 
 @api_view(['POST'])
@@ -18,8 +19,11 @@ def extract_proforma(request, request_id):
     if not purchase_request.proforma_file:
         return Response({'error': 'No proforma file uploaded'}, status=400)
 
-    # Extract data
-    extracted_data = extract.extract_proforma_data(purchase_request.proforma_file.path)
+    # Extract data (cached by file content), without extraction processes
+    with pdf_engine.in_process():
+        extracted_data = cache.cached_extraction(
+            'proforma', extract.PARSER_VERSION, purchase_request.proforma_file.path, extract.extract_proforma_data
+        )
 
     serializer = ProformaExtractionSerializer(data=extracted_data)
     if serializer.is_valid():
@@ -38,10 +42,27 @@ def validate_receipt(request, request_id):
     if not purchase_request.receipt_file:
         return Response({'error': 'No receipt file uploaded'}, status=400)
 
-    # Validate receipt
-    result = receipt_validation.validate_receipt(purchase_request.receipt_file.path, purchase_request)
+    # Validate receipt, extracting on this thread
+    with pdf_engine.in_process():
+        result = receipt_validation.validate_receipt(purchase_request.receipt_file.path, purchase_request)
 
     serializer = ReceiptValidationResultSerializer(data=result)
     if serializer.is_valid():
         return Response(serializer.validated_data)
-    return Response(serializer.errors, status=400)
\ No newline at end of file
+    return Response(serializer.errors, status=400)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    try:
+        job = DocumentJob.objects.select_related('purchase_request').get(id=job_id)
+    except DocumentJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=404)
+
+    # Staff may only poll jobs for their own requests
+    if request.user.role == 'staff' and job.purchase_request.created_by_id != request.user.id:
+        return Response({'error': 'Job not found'}, status=404)
+
+    serializer = DocumentJobSerializer(job)
+    return Response(serializer.data)
\ No newline at end of file
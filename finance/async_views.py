@@ -0,0 +1,28 @@
+"""Async handlers for the finance listings (see requests.asyncread)"""
+from requests.asyncread import Fallback, compile_plan, list_data, response
+from requests.models import PurchaseRequest
+from .serializers import PurchaseOrderSerializer
+
+
+def approved(request):
+    # IsFinanceUser; other roles get the DRF view's 403
+    if request.user.role != 'finance':
+        raise Fallback
+    return PurchaseRequest.objects.filter(status='approved')
+
+
+async def finance_list(request):
+    plan = compile_plan(PurchaseOrderSerializer(context={'request': request}))
+    data = await list_data(request, plan, approved(request), paginated=True)
+    return response(data, plan)
+
+
+async def approved_requests(request):
+    plan = compile_plan(PurchaseOrderSerializer(context={'fieldset_request': request}))
+    return response(await list_data(request, plan, approved(request)), plan)
+
+
+async def purchase_orders(request):
+    queryset = approved(request).filter(purchase_order_file__gt='')
+    plan = compile_plan(PurchaseOrderSerializer(context={'fieldset_request': request}))
+    return response(await list_data(request, plan, queryset), plan)
@@ -0,0 +1,108 @@
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from requests.models import Approval
+
+# Statuses finance exports by default: everything from approval onwards
+EXPORT_STATUSES = ['approved', 'ordered', 'delivered', 'completed']
+
+CSV_HEADER = [
+    'request_id', 'title', 'department', 'vendor_name', 'category', 'status', 'amount',
+    'created_by', 'created_at', 'updated_at',
+    'l1_approver', 'l1_status', 'l1_date', 'l2_approver', 'l2_status', 'l2_date',
+    'receipt_status', 'receipt_date',
+    'item_name', 'item_quantity', 'item_price', 'item_total',
+]
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset):
+    """Requests with everything the export reads, one query per relation per chunk"""
+    return queryset.select_related('created_by', 'receipt_validation').prefetch_related(
+        'items',
+        Prefetch('approvals', queryset=Approval.objects.select_related('approver')),
+    ).order_by('created_at', 'id')
+
+
+def iter_requests(queryset):
+    """Stream requests from a chunked (server-side where supported) cursor.
+
+    Prefetches run per chunk, so memory is bounded by EXPORT_CHUNK_SIZE
+    rather than by the size of the export.
+    """
+    return export_queryset(queryset).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def approval_columns(purchase_request):
+    by_level = {approval.level: approval for approval in purchase_request.approvals.all()}
+    columns = []
+    for level in (1, 2):
+        approval = by_level.get(level)
+        if approval is None:
+            columns += ['', '', '']
+        else:
+            columns += [approval.approver.get_full_name(), approval.status, approval.date.isoformat()]
+    return columns
+
+
+def csv_rows(queryset):
+    """CSV lines, one per request item (requests without items get one line)"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for purchase_request in iter_requests(queryset):
+        validation = getattr(purchase_request, 'receipt_validation', None)
+        base = [
+            purchase_request.id, purchase_request.title, purchase_request.department or '',
+            purchase_request.vendor_name or '', purchase_request.category or '',
+            purchase_request.status, purchase_request.amount,
+            purchase_request.created_by.get_full_name() or purchase_request.created_by.username,
+            purchase_request.created_at.isoformat(), purchase_request.updated_at.isoformat(),
+            *approval_columns(purchase_request),
+            validation.status if validation else '',
+            validation.date.isoformat() if validation else '',
+        ]
+        items = purchase_request.items.all()
+        if not items:
+            yield writer.writerow(base + ['', '', '', ''])
+        for item in items:
+            yield writer.writerow(base + [item.item_name, item.quantity, item.price, item.total])
+
+
+def ndjson_lines(queryset):
+    """One JSON document per request, with its items, approvals and receipt validation"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for purchase_request in iter_requests(queryset):
+        validation = getattr(purchase_request, 'receipt_validation', None)
+        yield encoder.encode({
+            'id': purchase_request.id,
+            'title': purchase_request.title,
+            'department': purchase_request.department,
+            'vendor_name': purchase_request.vendor_name,
+            'category': purchase_request.category,
+            'status': purchase_request.status,
+            'amount': purchase_request.amount,
+            'created_by': purchase_request.created_by.username,
+            'created_at': purchase_request.created_at.isoformat(),
+            'updated_at': purchase_request.updated_at.isoformat(),
+            'items': [
+                {'item_name': item.item_name, 'quantity': item.quantity, 'price': item.price, 'total': item.total}
+                for item in purchase_request.items.all()
+            ],
+            'approvals': [
+                {'level': approval.level, 'approver': approval.approver.username,
+                 'status': approval.status, 'comment': approval.comment, 'date': approval.date.isoformat()}
+                for approval in purchase_request.approvals.all()
+            ],
+            'receipt_validation': {
+                'status': validation.status, 'comment': validation.comment, 'date': validation.date.isoformat()
+            } if validation else None,
+        }) + '\n'
@@ -1,5 +1,7 @@
 from rest_framework import serializers
+from requests.fieldsets import SparseFieldsetMixin
 from requests.models import PurchaseRequest, ReceiptValidation
+from requests.serializers import ApprovalSerializer, RequestItemSerializer
 
 
 class ReceiptValidationSerializer(serializers.ModelSerializer):
@@ -8,7 +10,7 @@ class ReceiptValidationSerializer(serializers.ModelSerializer):
         fields = ['status', 'comment', 'date']
 
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     description = serializers.CharField(read_only=True)
     quantity = serializers.IntegerField(read_only=True)
@@ -24,6 +26,10 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             'receipt_file', 'status', 'created_at', 'updated_at', 'receipt_validation'
         ]
         read_only_fields = fields
+        expandable_fields = {
+            'items': (lambda: RequestItemSerializer(many=True, read_only=True), 'with_items'),
+            'approvals': (lambda: ApprovalSerializer(many=True, read_only=True), 'with_approvals'),
+        }
 
 
 class ReceiptValidationSerializer(serializers.Serializer):
@@ -35,4 +41,9 @@ class ReceiptValidationSerializer(serializers.Serializer):
             request = PurchaseRequest.objects.get(id=value, status='approved')
             return value
         except PurchaseRequest.DoesNotExist:
-            raise serializers.ValidationError("Purchase request not found or not approved")
\ No newline at end of file
+            raise serializers.ValidationError("Purchase request not found or not approved")
+
+
+class ReceiptDecisionSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=ReceiptValidation.STATUS_CHOICES)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
@@ -1,10 +1,22 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from requests.asyncread import async_view
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'', views.FinanceViewSet, basename='finance')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    # Async reads in front of the DRF views they fall back to
+    drf_views = {url.name: url.callback for url in router.urls}
+    urlpatterns = [
+        path('', async_view(async_views.finance_list, drf_views['finance-list'])),
+        path('approved_requests/',
+             async_view(async_views.approved_requests, drf_views['finance-approved-requests'])),
+        path('purchase_orders/', async_view(async_views.purchase_orders, drf_views['finance-purchase-orders'])),
+    ] + urlpatterns
@@ -1,48 +1,125 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from requests.models import PurchaseRequest, ReceiptValidation
-from .serializers import PurchaseOrderSerializer, ReceiptValidationSerializer
+from requests.models import PurchaseRequest
+from .serializers import PurchaseOrderSerializer, ReceiptDecisionSerializer
 from .permissions import IsFinanceUser
+from requests import fastread, fieldsets, transitions
+from requests.pagination import KeysetPagination, PurchaseRequestPagination, wants_keyset
 from documents.services import receipt_validation
+from . import exports
 
 
-class FinanceViewSet(viewsets.ModelViewSet):
-    queryset = PurchaseRequest.objects.filter(status='approved')
+class FinanceViewSet(fastread.FastListMixin, viewsets.ModelViewSet):
+    queryset = PurchaseRequest.objects.filter(status='approved').with_receipt_validation()
     serializer_class = PurchaseOrderSerializer
     permission_classes = [IsAuthenticated, IsFinanceUser]
+    pagination_class = PurchaseRequestPagination
+
+    def get_queryset(self):
+        return fieldsets.trim_queryset(super().get_queryset(), PurchaseOrderSerializer, self.request)
+
+    def list_response(self, request, queryset):
+        """Unpaginated by default; keyset-paged when the client asks for cursors"""
+        queryset = fieldsets.trim_queryset(queryset, PurchaseOrderSerializer, request)
+        context = {'fieldset_request': request}
+        plan = fastread.compile_plan(PurchaseOrderSerializer(context=context)) if fastread.enabled(request) else None
+        if plan is not None:
+            records = plan.values(queryset)
+            if wants_keyset(request):
+                paginator = KeysetPagination()
+                page = paginator.paginate_queryset(records, request, self)
+                return fastread.response(paginator.get_paginated_response(plan.rows(page)).data, plan)
+            return fastread.response(plan.rows(records), plan)
+
+        if wants_keyset(request):
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, request, self)
+            serializer = PurchaseOrderSerializer(page, many=True, context=context)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = PurchaseOrderSerializer(queryset, many=True, context=context)
+        return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def approved_requests(self, request):
-        requests = PurchaseRequest.objects.filter(status='approved')
-        serializer = PurchaseOrderSerializer(requests, many=True)
-        return Response(serializer.data)
+        requests = PurchaseRequest.objects.filter(status='approved').with_receipt_validation()
+        return self.list_response(request, requests)
 
     @action(detail=False, methods=['get'])
     def purchase_orders(self, request):
+        # purchase_order_file > '' excludes both NULL and empty values; the
+        # rows come from pr_status_created_idx in list order
         requests = PurchaseRequest.objects.filter(
-            status='approved'
-        ).exclude(purchase_order_file='')
-        serializer = PurchaseOrderSerializer(requests, many=True)
-        return Response(serializer.data)
+            status='approved', purchase_order_file__gt=''
+        ).with_receipt_validation()
+        return self.list_response(request, requests)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream requests with items, approvals and receipt status as CSV or NDJSON"""
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in ['csv', 'ndjson']:
+            return Response({'error': 'export_format must be csv or ndjson'}, status=400)
+
+        statuses = request.query_params.get('status')
+        statuses = statuses.split(',') if statuses else exports.EXPORT_STATUSES
+        invalid = [value for value in statuses if value not in exports.EXPORT_STATUSES]
+        if invalid:
+            return Response(
+                {'error': f"status must be one of {', '.join(exports.EXPORT_STATUSES)}"}, status=400
+            )
+        requests = PurchaseRequest.objects.filter(status__in=statuses)
+
+        # Whole-day bounds as datetimes, so the range stays on the created_at indexes
+        for param, lookup, days in [('since', 'created_at__gte', 0), ('until', 'created_at__lt', 1)]:
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    date = parse_date(value)
+                except ValueError:
+                    date = None
+                if date is None:
+                    return Response({'error': f'{param} must be a YYYY-MM-DD date'}, status=400)
+                bound = datetime.combine(date + timedelta(days=days), time.min)
+                if settings.USE_TZ:
+                    bound = timezone.make_aware(bound)
+                requests = requests.filter(**{lookup: bound})
+
+        if export_format == 'csv':
+            response = StreamingHttpResponse(exports.csv_rows(requests), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(exports.ndjson_lines(requests), content_type='application/x-ndjson')
+        file_name = f"purchase_requests_{timezone.now():%Y%m%d}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        return response
 
     @action(detail=True, methods=['post'])
     def validate_receipt(self, request, pk=None):
         try:
-            purchase_request = PurchaseRequest.objects.get(id=pk, status='approved')
+            # Only what the transition reads; it updates just the status columns
+            purchase_request = PurchaseRequest.objects.only('id', 'status', 'created_by_id').get(
+                id=pk, status='approved'
+            )
         except PurchaseRequest.DoesNotExist:
             return Response({'error': 'Purchase request not found'}, status=404)
 
-        serializer = ReceiptValidationSerializer(data=request.data)
+        serializer = ReceiptDecisionSerializer(data=request.data)
         if serializer.is_valid():
-            ReceiptValidation.objects.create(
-                purchase_request=purchase_request,
-                finance_user=request.user,
-                status=serializer.validated_data['status'],
-                comment=serializer.validated_data.get('comment', '')
-            )
-            purchase_request.status = 'completed'
-            purchase_request.save()
+            try:
+                transitions.complete(
+                    purchase_request,
+                    request.user,
+                    serializer.validated_data['status'],
+                    serializer.validated_data.get('comment', '')
+                )
+            except transitions.Conflict as conflict:
+                return Response({'error': str(conflict), 'status': conflict.current}, status=409)
             return Response({'message': 'Receipt validated successfully'})
-        return Response(serializer.errors, status=400)
\ No newline at end of file
+        return Response(serializer.errors, status=400)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PurchaseRequest, Approval, RequestItem, Attachment, ReceiptValidation
+from .models import PurchaseRequest, Approval, RequestItem, Attachment, ReceiptValidation, StatusCounter, ImportCheckpoint, OutboxEvent
 
 
 class RequestItemInline(admin.TabularInline):
@@ -65,4 +65,27 @@ class ReceiptValidationAdmin(admin.ModelAdmin):
     list_display = ('purchase_request', 'finance_user', 'status', 'date')
     list_filter = ('status', 'date')
     search_fields = ('purchase_request__title', 'finance_user__username')
-    readonly_fields = ('date',)
\ No newline at end of file
+    readonly_fields = ('date',)
+
+
+@admin.register(StatusCounter)
+class StatusCounterAdmin(admin.ModelAdmin):
+    list_display = ('status', 'owner', 'count')
+    list_filter = ('status',)
+    search_fields = ('owner__username',)
+    readonly_fields = ('owner', 'status', 'count')
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('source', 'lines', 'imported', 'skipped', 'updated_at')
+    search_fields = ('source',)
+    readonly_fields = ('source', 'offset', 'lines', 'imported', 'skipped', 'updated_at')
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'purchase_request', 'status', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('status', 'topic')
+    search_fields = ('purchase_request__title', 'error')
+    readonly_fields = ('created_at', 'started_at', 'processed_at')
@@ -6,4 +6,5 @@ class RequestsConfig(AppConfig):
     name = 'requests'
 
     def ready(self):
-        import requests.signals  # noqa
\ No newline at end of file
+        import requests.signals  # noqa
+        import requests.handlers  # noqa
\ No newline at end of file
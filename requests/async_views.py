@@ -0,0 +1,77 @@
+"""Async handlers for the request read endpoints (see asyncread).
+
+Each mirrors its DRF view for plain JSON GETs and raises Fallback for
+anything that view would answer differently: permission errors, invalid
+filters, unknown pages and missing objects.
+"""
+from . import conditional
+from .asyncread import Fallback, compile_plan, list_data, response
+from .models import PurchaseRequest
+from .serializers import PurchaseRequestSerializer, PurchaseRequestDetailSerializer
+
+STATUSES = dict(PurchaseRequest.STATUS_CHOICES)
+
+
+def filtered(request, queryset):
+    """The ?status= filter of the viewset's DjangoFilterBackend"""
+    status = request.query_params.get('status')
+    if status:
+        if status not in STATUSES:
+            raise Fallback
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+async def request_list(request):
+    queryset = filtered(request, PurchaseRequest.objects.visible_to(request.user))
+    etag = await conditional.alist_etag(request, queryset)
+    not_modified = conditional.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    plan = compile_plan(PurchaseRequestSerializer(context={'request': request}))
+    data = await list_data(request, plan, queryset, paginated=True)
+    return conditional.add_validators(response(data, plan), etag)
+
+
+async def request_detail(request, pk):
+    queryset = filtered(request, PurchaseRequest.objects.visible_to(request.user)).filter(pk=pk)
+    updated_at = await queryset.order_by().values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        raise Fallback
+    etag = conditional.make_etag(request, updated_at.isoformat())
+    not_modified = conditional.not_modified(request, etag, updated_at)
+    if not_modified is not None:
+        return not_modified
+
+    plan = compile_plan(PurchaseRequestDetailSerializer(context={'request': request}))
+    rows = await list_data(request, plan, queryset)
+    if not rows:
+        raise Fallback
+    return conditional.add_validators(response(rows[0], plan), etag, updated_at)
+
+
+async def my_approvals(request):
+    if request.user.role not in ['approver1', 'approver2', 'admin']:
+        raise Fallback
+    queryset = PurchaseRequest.objects.filter(approvals__approver=request.user).distinct()
+    plan = compile_plan(PurchaseRequestSerializer(context={'request': request}))
+    return response(await list_data(request, plan, queryset), plan)
+
+
+async def pending_approvals(request):
+    if request.user.role == 'approver1':
+        queryset = PurchaseRequest.objects.filter(status='pending_l1')
+    elif request.user.role == 'approver2':
+        queryset = PurchaseRequest.objects.filter(status='pending_l2')
+    else:
+        raise Fallback
+    etag = await conditional.alist_etag(request, queryset)
+    not_modified = conditional.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    # No 'request' in the context: file URLs stay relative, as in the DRF view
+    plan = compile_plan(PurchaseRequestSerializer(context={'fieldset_request': request}))
+    data = await list_data(request, plan, queryset)
+    return conditional.add_validators(response(data, plan), etag)
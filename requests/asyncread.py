@@ -0,0 +1,156 @@
+"""Async read path for ASGI deployments.
+
+DRF views are synchronous: under ASGI each call holds asgiref's sync thread
+from authentication to rendering. The views built here answer the polling
+reads (plain JSON GETs) as native coroutines instead. Token checks,
+negotiation, plan compilation and rendering run on the event loop, and only
+the queries go through the async ORM. Output comes from the fast read plans,
+so the bytes and headers match the DRF views. Everything else (other
+methods, the browsable API, keyset cursors, errors) is handed to the DRF view.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import APIException
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from accounts.authentication import CachedJWTAuthentication, aload_user, check_user
+from . import fastread
+from .pagination import PurchaseRequestPagination, wants_keyset
+
+
+class Fallback(Exception):
+    """Raised by a handler to let the DRF view answer the request in full"""
+
+
+async def authenticate(request):
+    """The active user of a valid bearer token, as CachedJWTAuthentication finds it.
+
+    None for anything else, so the DRF view produces the exact 401.
+    """
+    authentication = CachedJWTAuthentication()
+    try:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+        return check_user(await aload_user(token[jwt_settings.USER_ID_CLAIM]), token)
+    except (APIException, KeyError):
+        return None
+
+
+async def json_request(request):
+    """A DRF Request for an authenticated GET that negotiates plain JSON, or None"""
+    user = await authenticate(request)
+    if user is None:
+        return None
+    drf_request = Request(request)
+    drf_request.user = user
+
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        renderer, media_type = DefaultContentNegotiation().select_renderer(drf_request, renderers)
+    except APIException:
+        return None
+    drf_request.accepted_renderer, drf_request.accepted_media_type = renderer, media_type
+    # Same conditions as the fast read path: JSON, no indent, enabled
+    return drf_request if fastread.enabled(drf_request) else None
+
+
+def allow_header(view):
+    """The Allow header DRF sends for a view function from as_view()"""
+    names = set(getattr(view, 'actions', None) or {})
+    if 'get' in names:
+        names.add('head')
+    return ', '.join(
+        method.upper() for method in view.cls.http_method_names
+        if method in names or hasattr(view.cls, method)
+    )
+
+
+def async_view(handler, fallback):
+    """An async view serving plain JSON GETs with handler(request, **kwargs)
+    and every other request with the DRF view `fallback`, in a thread"""
+    sync_view = sync_to_async(fallback)
+    allow = allow_header(fallback)
+
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET':
+            drf_request = await json_request(request)
+            if drf_request is not None:
+                try:
+                    response = await handler(drf_request, *args, **kwargs)
+                except Fallback:
+                    pass
+                else:
+                    # As APIView.finalize_response adds them
+                    response['Allow'] = allow
+                    patch_vary_headers(response, ['Accept'])
+                    return response
+        return await sync_view(request, *args, **kwargs)
+
+    view = functools.wraps(handler)(view)
+    # DRF views are exempt and enforce CSRF in SessionAuthentication
+    view.csrf_exempt = True
+    # Read by the browsable API's breadcrumbs and by schema generators
+    for name in ('cls', 'initkwargs', 'actions'):
+        if hasattr(fallback, name):
+            setattr(view, name, getattr(fallback, name))
+    return view
+
+
+async def fetch(queryset):
+    return [row async for row in queryset]
+
+
+async def paginate(request, records, pagination_class=PurchaseRequestPagination):
+    """Page-number paging of a plan's values(), with the count and the page
+    fetched asynchronously. Returns (paginator, rows); the paginator is None
+    when paging is off."""
+    paginator = pagination_class()
+    paginator.keyset = None
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None, await fetch(records)
+
+    django_paginator = paginator.django_paginator_class(records, page_size)
+    django_paginator.count = await records.acount()
+    try:
+        paginator.page = django_paginator.page(paginator.get_page_number(request, django_paginator))
+    except InvalidPage:
+        raise Fallback
+    paginator.request = request
+    rows = await fetch(paginator.page.object_list)
+    return paginator, rows
+
+
+async def list_data(request, plan, queryset, paginated=False):
+    """Serialized rows of the queryset, in the page-number envelope if paginated"""
+    if wants_keyset(request):
+        raise Fallback
+    records = plan.values(queryset)
+    if not paginated:
+        return await plan.arows(await fetch(records))
+    paginator, page = await paginate(request, records)
+    rows = await plan.arows(page)
+    return rows if paginator is None else paginator.get_paginated_response(rows).data
+
+
+def compile_plan(serializer):
+    plan = fastread.compile_plan(serializer)
+    if plan is None:
+        raise Fallback
+    return plan
+
+
+def response(data, plan=None):
+    """Rendered as the JSON view would: serializer data always goes through the stdlib encoder"""
+    stdlib = plan is None or plan.has_large_floats()
+    return HttpResponse(fastread.render(data, stdlib=stdlib), content_type='application/json')
@@ -0,0 +1,34 @@
+"""Shared setup for the benchmark commands.
+
+Benchmarks run against the configured database inside rolled_back(), so
+nothing they generate or change is kept, and seed through
+generate_dataset() so every benchmark measures the same kind of data (see
+datagen).
+"""
+from contextlib import contextmanager
+
+from django.core.management.base import CommandError
+from django.db import transaction
+
+from .datagen import DatasetGenerator
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def generate_dataset(prefix, users, requests=0, seed=42, items_per_request=3, **options):
+    """Generate `users` users and `requests` requests with usernames starting
+    with the prefix, returning the generator (its .users maps role to ids).
+    Extra options go to DatasetGenerator."""
+    generator = DatasetGenerator(seed=seed, prefix=prefix, **options)
+    if generator.exists():
+        raise CommandError(f"Users prefixed '{prefix}_' already exist")
+    generator.create_users(users)
+    if requests:
+        generator.create_requests(requests, items_per_request=items_per_request)
+    return generator
@@ -0,0 +1,24 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """Let bulk inserts keep the created_at/updated_at/date values they carry.
+
+    auto_now and auto_now_add overwrite those fields on insert, which is wrong
+    for imported history and generated datasets. Flags are restored on exit;
+    only use this from management commands, as it changes the model fields
+    for the whole process.
+    """
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            for flag in ('auto_now', 'auto_now_add'):
+                if getattr(field, flag, False):
+                    setattr(field, flag, False)
+                    changed.append((field, flag))
+    try:
+        yield
+    finally:
+        for field, flag in changed:
+            setattr(field, flag, True)
@@ -0,0 +1,89 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# One aggregate that moves with any change to a list's rows (see list_etag)
+LIST_VERSION = {'n': Count('id'), 'last': Max('updated_at'), 'top': Max('id')}
+
+
+def make_etag(request, *parts):
+    """Strong ETag over the data version, the caller and the exact URL/format"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = ':'.join(str(part) for part in (
+        request.user.pk, request.get_full_path(), getattr(renderer, 'format', ''), *parts
+    ))
+    return quote_etag(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+
+def list_etag(request, queryset):
+    """ETag for a list, from one aggregate over the filtered rows.
+
+    Any change to a request (including approvals and items, which touch
+    updated_at, and renames or role changes of its creator or approvers,
+    which the rows show) moves the max updated_at; rows leaving the set
+    change the count. No Last-Modified is sent for lists since deletions don't move it.
+
+    The owner and status lists are answered from the covering
+    pr_owner_updated_idx/pr_status_updated_idx entries of the set. The
+    unfiltered admin list reads the narrowest covering index in full.
+    """
+    version = queryset.order_by().aggregate(**LIST_VERSION)
+    return make_etag(request, version['n'], version['last'], version['top'])
+
+
+async def alist_etag(request, queryset):
+    """list_etag() for async views"""
+    version = await queryset.order_by().aaggregate(**LIST_VERSION)
+    return make_etag(request, version['n'], version['last'], version['top'])
+
+
+def not_modified(request, etag, last_modified=None):
+    """A 304 response when the client's validators are current, else None"""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if isinstance(response, HttpResponseNotModified):
+        return add_validators(response, etag, last_modified)
+    return None
+
+
+def add_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Always revalidate, and never share across users
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified for list and retrieve, answering 304 before any
+    rows are loaded or serialized when the client is already current"""
+
+    def list(self, request, *args, **kwargs):
+        etag = list_etag(request, self.filter_queryset(self.get_queryset()))
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return add_validators(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        # The role-filtered queryset decides visibility, as in get_object()
+        try:
+            updated_at = self.filter_queryset(self.get_queryset()).order_by().filter(
+                **lookup
+            ).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            updated_at = None
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag(request, updated_at.isoformat())
+        response = not_modified(request, etag, updated_at)
+        if response is not None:
+            return response
+        return add_validators(super().retrieve(request, *args, **kwargs), etag, updated_at)
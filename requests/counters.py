@@ -0,0 +1,85 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+
+def record(changes):
+    """Apply status transitions to the counters.
+
+    changes is an iterable of (owner_id, old_status, new_status); old_status
+    is None for new requests and new_status is None for deleted ones. Each
+    transition moves one unit in the owner's counters and in the overall
+    counters (owner NULL). Call inside the transaction making the change.
+    """
+    from .models import StatusCounter
+
+    deltas = Counter()
+    for owner_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        for owner in (owner_id, None):
+            if old_status is not None:
+                deltas[owner, old_status] -= 1
+            if new_status is not None:
+                deltas[owner, new_status] += 1
+
+    # Lock counter rows in one global order (overall counters last), so two
+    # batches touching the same owners in opposite orders can't deadlock
+    ordered = sorted(deltas.items(), key=lambda kv: (kv[0][0] is None, kv[0][0] or 0, kv[0][1]))
+    for (owner_id, status), delta in ordered:
+        if not delta:
+            continue
+        counter = StatusCounter.objects.filter(owner_id=owner_id, status=status)
+        if counter.update(count=F('count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                StatusCounter.objects.create(owner_id=owner_id, status=status, count=delta)
+        except IntegrityError:
+            # Created concurrently between the UPDATE and the INSERT
+            counter.update(count=F('count') + delta)
+
+
+def counts(owner=None):
+    """{status: count} for every status, overall or for one owner"""
+    from .models import PurchaseRequest, StatusCounter
+
+    result = {status: 0 for status, _ in PurchaseRequest.STATUS_CHOICES}
+    if owner is None:
+        rows = StatusCounter.objects.filter(owner__isnull=True)
+    else:
+        rows = StatusCounter.objects.filter(owner=owner)
+    result.update(rows.values_list('status', 'count'))
+    return result
+
+
+def counts_from_table():
+    """{status: count} computed with a GROUP BY, for checking the counters"""
+    from .models import PurchaseRequest
+
+    result = {status: 0 for status, _ in PurchaseRequest.STATUS_CHOICES}
+    result.update(
+        PurchaseRequest.objects.order_by().values_list('status').annotate(n=Count('id'))
+    )
+    return result
+
+
+def rebuild():
+    """Recompute every counter from the purchase_requests table"""
+    from .models import PurchaseRequest, StatusCounter
+
+    with transaction.atomic():
+        # Lock the counters so concurrent transitions wait for the rebuild
+        list(StatusCounter.objects.select_for_update().values_list('id', flat=True))
+        StatusCounter.objects.all().delete()
+
+        per_owner = PurchaseRequest.objects.order_by().values('created_by', 'status').annotate(n=Count('id'))
+        overall = Counter()
+        rows = []
+        for row in per_owner:
+            overall[row['status']] += row['n']
+            rows.append(StatusCounter(owner_id=row['created_by'], status=row['status'], count=row['n']))
+        rows.extend(StatusCounter(owner=None, status=status, count=n) for status, n in overall.items())
+        StatusCounter.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
@@ -0,0 +1,240 @@
+"""Synthetic purchase request datasets for load testing and benchmarks.
+
+Generates users across all roles and purchase requests with consistent
+items, approvals, receipt validations and status counters, inserted in
+batches. The same seed, sizes and end date always produce the same rows.
+"""
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters
+from .bulk import keep_timestamps
+from .models import Approval, PurchaseRequest, ReceiptValidation, RequestItem
+
+User = get_user_model()
+
+# Share of generated users per role (at least one of each is created)
+ROLE_WEIGHTS = {'staff': 80, 'approver1': 8, 'approver2': 5, 'finance': 5, 'admin': 2}
+
+# Most history is settled; a working queue stays open at every stage
+STATUS_WEIGHTS = {
+    'pending_l1': 8,
+    'rejected_l1': 6,
+    'pending_l2': 5,
+    'rejected_l2': 3,
+    'approved': 8,
+    'ordered': 5,
+    'delivered': 5,
+    'completed': 60,
+}
+PAST_L1 = {'pending_l2', 'rejected_l2', 'approved', 'ordered', 'delivered', 'completed'}
+PAST_L2 = {'approved', 'ordered', 'delivered', 'completed'}
+RECEIPT_WEIGHTS = {'received': 85, 'partially_received': 10, 'not_received': 5}
+
+DEPARTMENT_WEIGHTS = {
+    'IT': 25, 'Engineering': 20, 'Operations': 15, 'Facilities': 10, 'Marketing': 8,
+    'Sales': 8, 'Finance': 5, 'HR': 4, 'Design': 3, 'Admin': 2,
+}
+URGENCY_WEIGHTS = {'low': 20, 'normal': 55, 'high': 20, 'critical': 5}
+
+# Category -> (item, typical unit price)
+CATALOGUE = {
+    'hardware': [('Laptop Computer', 1200), ('Monitor', 280), ('External Hard Drive', 90),
+                 ('Wireless Router', 75), ('Docking Station', 180), ('Keyboard and Mouse', 60)],
+    'software': [('Software License', 300), ('Cloud Subscription', 1200), ('Antivirus License', 45),
+                 ('Design Suite Seat', 650)],
+    'office_supplies': [('Printer Paper (500 sheets)', 45), ('Toner Cartridge', 110), ('Notebooks', 12),
+                        ('Whiteboard', 120), ('Desk Organizer', 25)],
+    'equipment': [('Office Chair', 250), ('Conference Table', 1500), ('Projector', 800),
+                  ('Coffee Machine', 350), ('Standing Desk', 600)],
+    'services': [('Consulting Services (per day)', 500), ('Maintenance Contract', 2400),
+                 ('Training Session', 900), ('Cleaning Services', 400)],
+}
+CATEGORY_WEIGHTS = {'hardware': 30, 'software': 20, 'office_supplies': 25, 'equipment': 15, 'services': 10}
+VENDOR_PREFIXES = ['Tech', 'Office', 'Global', 'Business', 'Digital', 'Professional', 'Prime', 'Metro',
+                   'Summit', 'Atlas', 'Pioneer', 'Northern', 'Blue', 'Crystal', 'United']
+VENDOR_SUFFIXES = ['Corp Solutions', 'Supplies Inc', 'Electronics', 'Services Ltd', 'Solutions',
+                   'Trading Co', 'Systems', 'Partners', 'Distribution', 'Group']
+QUANTITY_WEIGHTS = {1: 50, 2: 20, 3: 10, 4: 6, 5: 6, 10: 5, 20: 3}
+
+
+def weighted(weights):
+    """(values, cumulative weights) for rng.choices"""
+    return list(weights), list(accumulate(weights.values()))
+
+
+class DatasetGenerator:
+    """Builds one dataset; usernames and emails start with the prefix"""
+
+    def __init__(self, seed=42, prefix='load', end=None, days=365, batch_size=2000, password=None):
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.end = end or timezone.localdate()
+        # Nothing is dated after the end date (or after now, by default)
+        self.horizon = timezone.make_aware(datetime.combine(end, time.max)) if end else timezone.now()
+        self.days = days
+        self.batch_size = batch_size
+        self.password = make_password(password) if password else '!'
+        self.users = {}
+        self.created = {'users': 0, 'requests': 0, 'items': 0, 'approvals': 0, 'receipt_validations': 0}
+        self.po_number = 0
+
+        self.statuses = weighted(STATUS_WEIGHTS)
+        self.receipts = weighted(RECEIPT_WEIGHTS)
+        self.departments = weighted(DEPARTMENT_WEIGHTS)
+        self.urgencies = weighted(URGENCY_WEIGHTS)
+        self.categories = weighted(CATEGORY_WEIGHTS)
+        self.quantities = weighted(QUANTITY_WEIGHTS)
+        # A long tail of vendors, a few of them taking most of the orders
+        vendors = [f'{a} {b}' for a in VENDOR_PREFIXES for b in VENDOR_SUFFIXES]
+        self.rng.shuffle(vendors)
+        self.vendors = vendors, list(accumulate(1 / (rank + 1) for rank in range(len(vendors))))
+
+    def exists(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}_').exists()
+
+    def create_users(self, count):
+        """count users split by ROLE_WEIGHTS, with one shared password hash"""
+        total = sum(ROLE_WEIGHTS.values())
+        sizes = {role: max(1, count * weight // total) for role, weight in ROLE_WEIGHTS.items()}
+        sizes['staff'] += max(0, count - sum(sizes.values()))
+
+        rows = []
+        for role, size in sizes.items():
+            for i in range(size):
+                username = f'{self.prefix}_{role}_{i:05d}'
+                rows.append(User(
+                    username=username, email=f'{username}@example.com', password=self.password,
+                    first_name=role.capitalize(), last_name=f'{i:05d}', role=role,
+                    is_staff=role == 'admin', is_superuser=role == 'admin',
+                ))
+        with transaction.atomic():
+            created = User.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.users = {role: [user.id for user in created if user.role == role] for role in ROLE_WEIGHTS}
+        # Some staff raise far more requests than others
+        self.creators = self.users['staff'], list(accumulate(
+            1 / (rank + 1) ** 0.8 for rank in range(len(self.users['staff']))
+        ))
+        self.created['users'] += len(created)
+        return self.users
+
+    def create_requests(self, count, items_per_request=3, progress=None):
+        """count requests in batches; progress(created) is called after each batch"""
+        if not self.users:
+            raise ValueError('create_users() must run first')
+        done = 0
+        with keep_timestamps(PurchaseRequest, Approval, ReceiptValidation):
+            while done < count:
+                size = min(self.batch_size, count - done)
+                with transaction.atomic():
+                    self.create_batch(size, items_per_request)
+                done += size
+                if progress:
+                    progress(done)
+        return self.created
+
+    def create_batch(self, size, items_per_request):
+        rows = [self.request_row(items_per_request) for _ in range(size)]
+        requests = PurchaseRequest.objects.bulk_create([request for request, _, _, _ in rows])
+
+        items, approvals, validations = [], [], []
+        for request, request_items, request_approvals, validation in rows:
+            for child in request_items + request_approvals + ([validation] if validation else []):
+                child.purchase_request = request
+            items.extend(request_items)
+            approvals.extend(request_approvals)
+            if validation:
+                validations.append(validation)
+        RequestItem.objects.bulk_create(items, batch_size=self.batch_size)
+        Approval.objects.bulk_create(approvals, batch_size=self.batch_size)
+        ReceiptValidation.objects.bulk_create(validations, batch_size=self.batch_size)
+        counters.record((request.created_by_id, None, request.status) for request in requests)
+
+        self.created['requests'] += len(requests)
+        self.created['items'] += len(items)
+        self.created['approvals'] += len(approvals)
+        self.created['receipt_validations'] += len(validations)
+
+    def request_row(self, items_per_request):
+        """One unsaved request with its items, approvals and receipt validation"""
+        rng = self.rng
+        status = self.pick(self.statuses)
+        category = self.pick(self.categories)
+        department = self.pick(self.departments)
+        created_at = self.created_at()
+
+        items = []
+        for _ in range(rng.randint(1, max(1, 2 * items_per_request - 1))):
+            name, base = rng.choice(CATALOGUE[category])
+            price = Decimal(round(base * rng.lognormvariate(0, 0.25) * 100)) / 100
+            items.append(RequestItem(item_name=name, price=price, quantity=self.pick(self.quantities)))
+        amount = sum(item.price * item.quantity for item in items)
+
+        approvals, validation, updated_at = [], None, created_at
+        if status in PAST_L1 or status == 'rejected_l1':
+            updated_at = self.later(updated_at, hours=rng.expovariate(1 / 20))
+            approvals.append(self.approval(1, status == 'rejected_l1', updated_at))
+        if status in PAST_L2 or status == 'rejected_l2':
+            updated_at = self.later(updated_at, hours=rng.expovariate(1 / 30))
+            approvals.append(self.approval(2, status == 'rejected_l2', updated_at))
+        purchase_order_file = None
+        if status in PAST_L2:
+            self.po_number += 1
+            purchase_order_file = f'purchase_orders/{self.prefix}_po_{self.po_number}.pdf'
+        if status == 'completed':
+            updated_at = self.later(updated_at, days=rng.uniform(2, 21))
+            validation = ReceiptValidation(finance_user_id=rng.choice(self.users['finance']),
+                                           status=self.pick(self.receipts), date=updated_at)
+        elif status in ('ordered', 'delivered'):
+            updated_at = self.later(updated_at, days=rng.uniform(1, 10))
+
+        request = PurchaseRequest(
+            title=items[0].item_name if len(items) == 1 else f'{items[0].item_name} and {len(items) - 1} more',
+            description=f'{category.replace("_", " ").capitalize()} for the {department} department',
+            amount=amount,
+            quantity=len(items),
+            department=department,
+            vendor_name=self.pick(self.vendors),
+            category=category,
+            urgency=self.pick(self.urgencies),
+            status=status,
+            created_by_id=self.pick(self.creators),
+            purchase_order_file=purchase_order_file,
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+        return request, items, approvals, validation
+
+    def approval(self, level, rejected, date):
+        return Approval(
+            level=level,
+            approver_id=self.rng.choice(self.users[f'approver{level}']),
+            status='rejected' if rejected else 'approved',
+            comment='Not within budget' if rejected else '',
+            date=date,
+        )
+
+    def later(self, moment, **delta):
+        return min(moment + timedelta(**delta), self.horizon)
+
+    def pick(self, choices):
+        values, cum_weights = choices
+        return self.rng.choices(values, cum_weights=cum_weights)[0]
+
+    def created_at(self):
+        """Working hours on weekdays mostly, over the last `days` days"""
+        rng = self.rng
+        while True:
+            day = self.end - timedelta(days=rng.randrange(self.days))
+            if day.weekday() < 5 or rng.random() < 0.1:
+                break
+        hour = min(max(rng.gauss(11.5, 2.5), 0), 23.99)
+        moment = datetime.combine(day, time()) + timedelta(hours=hour)
+        return min(timezone.make_aware(moment), self.horizon)
@@ -0,0 +1,343 @@
+"""Fast read path for high-volume list endpoints.
+
+A serializer is compiled once per request into a plan: the columns it reads
+and one converter per output field, reusing the DRF field objects so every
+value is formatted exactly as the serializer would. Rows are then fetched
+with values_list() (nested lists with one extra query each) and rendered
+straight to JSON, skipping model instances, per-row serializer calls and
+ReturnDicts. The bytes match the regular serializer + JSONRenderer output;
+anything the compiler doesn't recognise falls back to the regular path.
+"""
+import decimal
+import re
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import parse_header_parameters
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import ISO_8601, api_settings
+
+from .models import RequestItem
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder gives the same bytes
+    orjson = None
+
+# Model properties read by ReadOnlyFields: (model, name) -> (columns, function)
+COMPUTED = {
+    (RequestItem, 'total'): (('price', 'quantity'), lambda price, quantity: price * quantity),
+}
+
+# Relative names and absolute base paths that quoting, urljoin and
+# build_absolute_uri all leave untouched: word characters, '-' and inner
+# dots only, so there are no dot segments, empty segments or schemes
+URL_SEGMENT = r'[\w\-]+(\.[\w\-]+)*'
+SAFE_FILE_NAME = re.compile(rf'{URL_SEGMENT}(/{URL_SEGMENT})*$', re.ASCII)
+SAFE_URL_PATH = re.compile(rf'/({URL_SEGMENT}/)*$', re.ASCII)
+
+# Python and orjson only format floats differently in exponent notation
+FLOAT_SAFE_LIMIT = 1e16
+
+
+class Unsupported(Exception):
+    pass
+
+
+def enabled(request):
+    """Only plain JSON responses (no ?format=api, no indent) take the fast path"""
+    if not settings.FAST_READ_SERIALIZATION:
+        return False
+    if not isinstance(getattr(request, 'accepted_renderer', None), JSONRenderer):
+        return False
+    _, params = parse_header_parameters(request.accepted_media_type or '')
+    return 'indent' not in params
+
+
+class Plan:
+    """Columns to fetch and converters to build one serializer's output rows"""
+
+    def __init__(self, serializer, columns=('id',)):
+        self.model = serializer.Meta.model
+        self.columns = list(columns)
+        self.fields = []  # (name, function(row) -> value)
+        self.nested = []  # (name, related model, foreign key, child plan)
+        self.children = []
+        self.large_floats = False
+        for name, field in serializer.fields.items():
+            self.compile_field(name, field)
+
+    def column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return self.columns.index(path)
+
+    def compile_field(self, name, field):
+        source = field.source
+        if source == '*':
+            raise Unsupported(name)
+        parts = source.split('.')
+
+        if isinstance(field, serializers.ListSerializer):
+            self.compile_many(name, field, parts)
+            return
+        if isinstance(field, serializers.ModelSerializer):
+            self.compile_one(name, field, parts)
+            return
+
+        model, path = self.model, []
+        for part in parts[:-1]:
+            model_field = get_field(model, part)
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise Unsupported(name)
+            path.append(part)
+            model = model_field.related_model
+        attr = parts[-1]
+
+        if attr == 'get_full_name' and issubclass(model, AbstractUser) \
+                and model.get_full_name is AbstractUser.get_full_name:
+            first = self.column('__'.join(path + ['first_name']))
+            last = self.column('__'.join(path + ['last_name']))
+            self.fields.append((name, lambda row: ('%s %s' % (row[first], row[last])).strip()))
+            return
+
+        if (model, attr) in COMPUTED and isinstance(field, serializers.ReadOnlyField):
+            columns, function = COMPUTED[model, attr]
+            indexes = [self.column('__'.join(path + [column])) for column in columns]
+            self.fields.append((name, self.json_value(lambda row: function(*[row[i] for i in indexes]))))
+            return
+
+        model_field = get_field(model, attr)
+        if not model_field.concrete or model_field.many_to_many:
+            raise Unsupported(name)
+        index = self.column('__'.join(path + [attr]))
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            self.fields.append((name, lambda row: row[index]))
+        elif isinstance(field, serializers.FileField):
+            self.fields.append((name, file_url(field, model_field, index)))
+        elif isinstance(field, serializers.ReadOnlyField):
+            self.fields.append((name, self.json_value(lambda row: row[index])))
+        elif isinstance(field, (serializers.CharField, serializers.IntegerField, serializers.DecimalField,
+                                serializers.DateTimeField, serializers.ChoiceField, serializers.BooleanField)):
+            to_representation = converter(field)
+            self.fields.append((
+                name,
+                lambda row: None if row[index] is None else to_representation(row[index])
+            ))
+        else:
+            raise Unsupported(name)
+
+    def compile_one(self, name, field, parts):
+        """A nested serializer over a forward or reverse one-to-one/foreign key"""
+        if len(parts) != 1:
+            raise Unsupported(name)
+        model_field = get_field(self.model, parts[0])
+        if not (model_field.many_to_one or model_field.one_to_one):
+            raise Unsupported(name)
+        child = Plan(field)
+        if child.nested:
+            raise Unsupported(name)
+        present = self.column(f'{parts[0]}__id')
+        indexes = [self.column(f'{parts[0]}__{column}') for column in child.columns]
+
+        def nested(row):
+            if row[present] is None:
+                return None
+            child_row = [row[i] for i in indexes]
+            return {key: function(child_row) for key, function in child.fields}
+        self.fields.append((name, nested))
+        self.children.append(child)
+
+    def compile_many(self, name, field, parts):
+        """A nested list over a reverse foreign key, fetched with one query per page"""
+        if len(parts) != 1:
+            raise Unsupported(name)
+        model_field = get_field(self.model, parts[0])
+        if not model_field.one_to_many:
+            raise Unsupported(name)
+        child = Plan(field.child)
+        if child.nested:
+            raise Unsupported(name)
+        self.nested.append((name, model_field.related_model, model_field.field.name, child))
+        self.children.append(child)
+        self.fields.append((name, None))
+
+    def json_value(self, function):
+        """ReadOnlyField values go through DRF's encoder, which writes Decimals as floats"""
+        def convert(row):
+            value = function(row)
+            if isinstance(value, Decimal):
+                value = float(value)
+                if abs(value) >= FLOAT_SAFE_LIMIT:
+                    self.large_floats = True
+            return value
+        return convert
+
+    def has_large_floats(self):
+        return self.large_floats or any(child.large_floats for child in self.children)
+
+    def values(self, queryset):
+        """The queryset as named tuples of this plan's columns (paginators can slice it)"""
+        return queryset.prefetch_related(None).values_list(*self.columns, named=True)
+
+    def rows(self, records):
+        """Serialized rows for fetched records, loading nested lists in bulk"""
+        records = list(records)
+        nested = {}
+        if self.nested and records:
+            for name, child, ids, queryset in self.nested_querysets(records):
+                nested[name] = group(ids, child, queryset)
+        return self.build(records, nested)
+
+    async def arows(self, records):
+        """rows() for async views, loading nested lists with the async ORM"""
+        nested = {}
+        if self.nested and records:
+            for name, child, ids, queryset in self.nested_querysets(records):
+                nested[name] = group(ids, child, [record async for record in queryset])
+        return self.build(records, nested)
+
+    def nested_querysets(self, records):
+        """(name, child plan, parent ids, (foreign key, *child columns) rows) per nested list"""
+        ids = [record[0] for record in records]
+        for name, model, foreign_key, child in self.nested:
+            yield name, child, ids, model._default_manager.filter(**{f'{foreign_key}__in': ids}).values_list(
+                foreign_key, *child.columns
+            )
+
+    def build(self, records, nested):
+        result = []
+        for record in records:
+            row = {}
+            for name, function in self.fields:
+                row[name] = nested[name][record[0]] if function is None else function(record)
+            result.append(row)
+        return result
+
+    def row(self, record):
+        return {name: function(record) for name, function in self.fields}
+
+
+def group(ids, child, records):
+    """Child rows per parent id, in fetch order"""
+    grouped = {pk: [] for pk in ids}
+    for record in records:
+        grouped[record[0]].append(child.row(record[1:]))
+    return grouped
+
+
+def get_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise Unsupported(name)
+
+
+def converter(field):
+    """field.to_representation, with the per-call settings lookups of the
+    common DateTimeField and DecimalField configurations resolved up front"""
+    if isinstance(field, serializers.DateTimeField) and \
+            getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601:
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if field_timezone is not None:
+            def datetime_value(value):
+                if isinstance(value, str) or not timezone.is_aware(value):
+                    return field.to_representation(value)
+                value = value.astimezone(field_timezone).isoformat()
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return datetime_value
+
+    if isinstance(field, serializers.DecimalField) and field.decimal_places is not None \
+            and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) \
+            and not field.localize and not field.normalize_output:
+        exponent = Decimal('.1') ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+
+        def decimal_value(value):
+            if not isinstance(value, Decimal):
+                return field.to_representation(value)
+            return '{:f}'.format(value.quantize(exponent, rounding=field.rounding, context=context))
+        return decimal_value
+
+    return field.to_representation
+
+
+def file_url(field, model_field, index):
+    """FileField.to_representation for a stored name instead of a FieldFile.
+
+    For the local filesystem storage, names made only of URL-safe characters
+    map to base URL + name with no quoting or joining to do, so the absolute
+    prefix is computed once instead of running urljoin for every row.
+    """
+    storage = model_field.storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+    request = field.context.get('request')
+
+    prefix = None
+    base_url = getattr(storage, 'base_url', None)
+    # __class__ rather than type(): default_storage is a lazy proxy
+    if isinstance(storage, FileSystemStorage) and storage.__class__.url is FileSystemStorage.url \
+            and base_url and SAFE_URL_PATH.match(base_url) and base_url.endswith('/'):
+        prefix = request.build_absolute_uri(base_url) if request is not None else base_url
+
+    def convert(row):
+        name = row[index]
+        if not name:
+            return None
+        if not use_url:
+            return name
+        if prefix is not None and SAFE_FILE_NAME.match(name):
+            return prefix + name
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def compile_plan(serializer):
+    """A Plan for the serializer, or None when it uses fields the fast path can't reproduce"""
+    try:
+        # created_at is always fetched for ordering and keyset cursors
+        return Plan(serializer, columns=('id', 'created_at'))
+    except Unsupported:
+        return None
+
+
+def render(data, stdlib=False):
+    """The same bytes as JSONRenderer for primitive data, with orjson when installed"""
+    if orjson is not None and not stdlib:
+        try:
+            content = orjson.dumps(data)
+        except TypeError:
+            pass
+        else:
+            return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+    return JSONRenderer().render(data)
+
+
+def response(data, plan, status=200):
+    return HttpResponse(render(data, stdlib=plan.has_large_floats()),
+                        status=status, content_type='application/json')
+
+
+class FastListMixin:
+    """list() over the fast read path when the request and serializer allow it"""
+
+    def list(self, request, *args, **kwargs):
+        plan = compile_plan(self.get_serializer()) if enabled(request) else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        records = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(records)
+        if page is not None:
+            return response(self.get_paginated_response(plan.rows(page)).data, plan)
+        return response(plan.rows(records), plan)
@@ -0,0 +1,91 @@
+from django.core.exceptions import FieldDoesNotExist
+
+# Always loaded: the primary key, and created_at for ordering and cursors
+ALWAYS_LOADED = ['id', 'created_at']
+
+
+def requested(request, param):
+    """Comma-separated names from a query parameter, or None when absent"""
+    if request is None or request.method != 'GET':
+        return None
+    value = request.query_params.get(param)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """?fields= keeps only the listed fields; ?expand= adds optional nested ones.
+
+    Expandable fields are declared as Meta.expandable_fields = {name: (factory,
+    queryset_method)}, where factory builds the field and queryset_method is
+    the PurchaseRequestQuerySet method that preloads it. Only GET requests are
+    affected, so writes always see the full serializer. Views that serialize
+    without a 'request' in the context (keeping file URLs relative) pass it as
+    'fieldset_request' instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request') or self.context.get('fieldset_request')
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+
+        expand = requested(request, 'expand') or set()
+        for name in expand & set(expandable):
+            factory, _ = expandable[name]
+            self.fields[name] = factory()
+
+        fields = requested(request, 'fields')
+        if fields is not None:
+            for name in set(self.fields) - fields - expand:
+                self.fields.pop(name)
+
+
+def trim_queryset(queryset, serializer_class, request):
+    """Load only what the selected fields read.
+
+    Columns of unselected fields are deferred, select_related and prefetches
+    for unselected relations are dropped, and expanded relations are preloaded
+    with their queryset method. Unchanged unless ?fields= or ?expand= is given.
+    """
+    fields = requested(request, 'fields')
+    expand = requested(request, 'expand')
+    if fields is None and expand is None:
+        return queryset
+
+    serializer = serializer_class(context={'fieldset_request': request})
+    expandable = getattr(serializer.Meta, 'expandable_fields', {})
+    for name in (expand or set()) & set(expandable):
+        queryset = getattr(queryset, expandable[name][1])()
+    if fields is None:
+        return queryset
+
+    model = queryset.model
+    columns, relations = set(ALWAYS_LOADED), set()
+    for field in serializer.fields.values():
+        if field.source == '*':
+            return queryset
+        root = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(root)
+        except FieldDoesNotExist:
+            # A property or method may read anything; keep every column
+            return queryset
+        if model_field.concrete or model_field.one_to_one:
+            columns.add(root)
+        if model_field.is_relation:
+            relations.add(root)
+
+    # Only keep preloads whose first hop is a selected relation
+    select = queryset.query.select_related
+    if isinstance(select, dict):
+        kept = [name for name in select if name in relations]
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*kept)
+    lookups = queryset._prefetch_related_lookups
+    queryset = queryset.prefetch_related(None).prefetch_related(*[
+        lookup for lookup in lookups
+        if getattr(lookup, 'prefetch_through', lookup).split('__')[0] in relations
+    ])
+    return queryset.only(*columns)
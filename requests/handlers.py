@@ -0,0 +1,15 @@
+"""Outbox handlers for workflow side effects (see outbox).
+
+Handlers run in the dispatcher, after the change committed, and may run more
+than once for the same event.
+"""
+from documents.services import jobs
+from . import outbox
+
+
+@outbox.handler(outbox.STATUS_CHANGED)
+def queue_purchase_order(event):
+    """Queue PO generation once a request is fully approved"""
+    if event.payload['to'] == 'approved':
+        # Skips requests with a PO or a queued job, so retries are harmless
+        jobs.enqueue_purchase_orders([event.purchase_request_id])
@@ -0,0 +1,252 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from itertools import cycle
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import authentication
+from requests.benchmarking import generate_dataset, rolled_back
+from requests.models import PurchaseRequest
+
+User = get_user_model()
+
+PASSWORD = 'benchmark-password'
+
+# (name, role, method, url, payload). {id} is a request the user can see, or
+# for approve a fresh pending_l1 request; login payloads use {username}/{email}.
+SCENARIOS = [
+    ('requests list', 'staff', 'get', '/api/request/requests/', None),
+    ('request detail', 'staff', 'get', '/api/request/requests/{id}/', None),
+    ('requests list', 'approver1', 'get', '/api/request/requests/', None),
+    ('pending approvals', 'approver1', 'get', '/api/request/approvals/pending/', None),
+    ('pending approvals', 'approver2', 'get', '/api/request/approvals/pending/', None),
+    ('approve', 'approver1', 'post', '/api/request/requests/{id}/approve/', {'comment': 'Benchmark'}),
+    ('finance list', 'finance', 'get', '/api/finance/', None),
+    ('login (username)', 'staff', 'post', '/api/auth/login/', {'email': '{username}', 'password': PASSWORD}),
+    ('login (email)', 'staff', 'post', '/api/auth/login/', {'email': '{email}', 'password': PASSWORD}),
+]
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot API endpoints per role: throughput, latency percentiles, queries and memory (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000,
+                            help='Purchase requests in the generated dataset')
+        parser.add_argument('--users', type=int, default=200,
+                            help='Users in the generated dataset')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=200,
+                            help='Timed calls per scenario')
+        parser.add_argument('--login-iterations', type=int, default=20,
+                            help='Timed calls per login scenario (password hashing is slow)')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Untimed calls per scenario before measuring')
+        parser.add_argument('--only', help='Comma-separated scenario names to run')
+        parser.add_argument('--json', dest='json_path',
+                            help='Write the results to this file')
+        parser.add_argument('--baseline',
+                            help='Results file of an earlier run; fail on regressions against it')
+        parser.add_argument('--max-regression', type=float, default=25,
+                            help='Allowed p95 latency increase over the baseline, in percent')
+
+    def handle(self, *args, **options):
+        self.options = options
+        scenarios = SCENARIOS
+        if options['only']:
+            names = {name.strip() for name in options['only'].split(',')}
+            scenarios = [scenario for scenario in SCENARIOS if scenario[0] in names]
+            if not scenarios:
+                raise CommandError(f"No scenarios named {options['only']}")
+
+        results = []
+        with rolled_back():
+            self.seed()
+            for scenario in scenarios:
+                results.append(self.run(*scenario))
+
+        self.report(results)
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                **{key: options[key] for key in ('requests', 'users', 'seed', 'iterations', 'login_iterations')},
+            },
+            'results': results,
+        }
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['json_path']}")
+        if options['baseline']:
+            self.compare(results)
+
+    def seed(self):
+        self.stdout.write(f"Generating {self.options['requests']} requests for {self.options['users']} users...")
+        generator = generate_dataset(
+            'apibench', self.options['users'], self.options['requests'], seed=self.options['seed'], password=PASSWORD
+        )
+        self.users = generator.users
+
+        # The busiest staff members, as those see the largest lists
+        staff = list(
+            PurchaseRequest.objects.filter(created_by__in=self.users['staff'])
+            .values('created_by').annotate(n=Count('id')).order_by('-n', 'created_by')
+            .values_list('created_by', flat=True)[:10]
+        )
+        self.users['staff'] = staff
+        accounts = User.objects.in_bulk([pk for pks in self.users.values() for pk in pks])
+        self.clients = {
+            role: [(accounts[pk], Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(accounts[pk])}'))
+                   for pk in pks[:10]]
+            for role, pks in self.users.items()
+        }
+        self.own_requests = {
+            pk: list(PurchaseRequest.objects.filter(created_by=pk).values_list('id', flat=True)[:50])
+            for pk in staff
+        }
+        self.pending = list(PurchaseRequest.objects.filter(status='pending_l1').values_list('id', flat=True))
+
+    def calls(self, role, url, payload):
+        """Endless (client, url, payload) for the scenario"""
+        if '{id}' in url and not any(self.own_requests.values()):
+            raise CommandError('The dataset has no requests; raise --requests')
+        for user, client in cycle(self.clients[role]):
+            if '{id}' in url:
+                if url.endswith('/approve/'):
+                    if not self.pending:
+                        raise CommandError('Not enough pending_l1 requests; raise --requests')
+                    pk = self.pending.pop()
+                else:
+                    ids = self.own_requests.get(user.pk)
+                    if not ids:
+                        continue
+                    pk = ids[len(ids) // 2]
+                yield client, url.format(id=pk), payload
+            elif payload is not None:
+                data = {key: value.format(username=user.username, email=user.email)
+                        for key, value in payload.items()}
+                # Login is anonymous
+                yield Client(), url, data
+            else:
+                yield client, url, payload
+
+    def call(self, client, method, url, payload):
+        if method == 'post':
+            response = client.post(url, payload, content_type='application/json')
+        else:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{method.upper()} {url} returned {response.status_code}: {response.content[:200]!r}')
+        # Streaming responses are consumed so their cost is measured too
+        return b''.join(response) if response.streaming else response.content
+
+    def run(self, name, role, method, url, payload):
+        iterations = self.options['login_iterations'] if url == '/api/auth/login/' else self.options['iterations']
+        calls = self.calls(role, url, payload)
+
+        for _ in range(self.options['warmup']):
+            client, call_url, call_payload = next(calls)
+            self.call(client, method, call_url, call_payload)
+
+        latencies, queries, sizes = [], [], []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            client, call_url, call_payload = next(calls)
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                content = self.call(client, method, call_url, call_payload)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            sizes.append(len(content))
+        elapsed = time.perf_counter() - started
+
+        # Allocations are traced separately; tracemalloc slows every call down
+        peaks = []
+        for _ in range(min(5, iterations)):
+            client, call_url, call_payload = next(calls)
+            tracemalloc.start()
+            self.call(client, method, call_url, call_payload)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+
+        return {
+            'scenario': name,
+            'role': role,
+            'method': method.upper(),
+            'url': url,
+            'iterations': iterations,
+            'throughput': round(iterations / elapsed, 3),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'queries': max(queries),
+            'bytes': round(statistics.mean(sizes)),
+            'peak_kb': round(statistics.median(peaks)) if peaks else 0,
+        }
+
+    def key(self, result):
+        return f"{result['scenario']} ({result['role']})"
+
+    def report(self, results):
+        self.stdout.write('='*78)
+        self.stdout.write(f"API BENCHMARK ({self.options['requests']} requests, {connection.vendor})")
+        self.stdout.write('='*78)
+        self.stdout.write(f"{'scenario':<30}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'queries':>9}{'peak KB':>9}")
+        for result in results:
+            self.stdout.write(
+                f"{self.key(result):<30}{result['throughput']:>8.1f}{result['p50_ms']:>8.1f}"
+                f"{result['p95_ms']:>8.1f}{result['p99_ms']:>8.1f}{result['queries']:>9}{result['peak_kb']:>9}"
+            )
+        self.stdout.write('='*78)
+        self.stdout.write('Latencies in ms; queries is the most any single call issued')
+        cache = authentication.stats()
+        if cache['hit_rate'] is not None:
+            self.stdout.write(f"Authenticated-user cache: {cache['hits']} hits, {cache['misses']} misses "
+                              f"({cache['hit_rate']:.1%} hit rate, {cache['ttl']}s TTL)")
+
+    def compare(self, results):
+        """Fail when a scenario issues more queries or its p95 grows past --max-regression"""
+        try:
+            with open(self.options['baseline']) as handle:
+                baseline = {self.key(result): result for result in json.load(handle)['results']}
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read baseline {self.options['baseline']}: {exc}")
+
+        regressions = []
+        self.stdout.write(f"{'scenario':<30}{'p95 before':>12}{'p95 after':>12}{'change':>9}{'queries':>10}")
+        for result in results:
+            before = baseline.get(self.key(result))
+            if before is None:
+                continue
+            change = (result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0
+            line = (f"{self.key(result):<30}{before['p95_ms']:>12.1f}{result['p95_ms']:>12.1f}{change:>+8.0f}%"
+                    f"{before['queries']:>5} ->{result['queries']:>3}")
+            if change > self.options['max_regression'] or result['queries'] > before['queries']:
+                regressions.append(self.key(result))
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"{len(regressions)} scenario(s) regressed: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import cycle
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from rest_framework_simplejwt.tokens import AccessToken
+
+from requests.datagen import DatasetGenerator
+from requests.management.commands.benchmark_sqlite_concurrency import use_database
+from requests.models import PurchaseRequest
+
+User = get_user_model()
+
+# Polling mix per role; {id} is one of the staff member's requests
+POLLS = {
+    'staff': ['/api/request/requests/', '/api/request/requests/{id}/', '/api/auth/profile/'],
+    'approver1': ['/api/request/approvals/pending/', '/api/request/requests/my_approvals/'],
+    'approver2': ['/api/request/approvals/pending/', '/api/auth/profile/'],
+    'finance': ['/api/finance/', '/api/finance/approved_requests/'],
+}
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))]
+
+
+async def http_get(reader, writer, path, token):
+    """One keep-alive GET: (status, body, whether the server keeps the connection)"""
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n'
+        f'Accept: application/json\r\n\r\n'.encode('latin-1')
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value == 'close':
+            keep_alive = False
+    return status, await reader.readexactly(length), keep_alive
+
+
+async def poller(port, calls, deadline, think_time, timeout, stats):
+    """A client polling its calls in turn over one connection until the deadline"""
+    reader = writer = None
+    for path, token in cycle(calls):
+        if time.monotonic() >= deadline:
+            break
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            status, _, keep_alive = await asyncio.wait_for(http_get(reader, writer, path, token), timeout)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            stats['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+        if status < 400:
+            stats['latencies'].append((time.perf_counter() - start) * 1000)
+        else:
+            stats['errors'] += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+        if think_time:
+            await asyncio.sleep(think_time / 1000)
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, clients, duration, think_time, timeout):
+    stats = {'latencies': [], 'errors': 0}
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(*[poller(port, calls, deadline, think_time, timeout, stats) for calls in clients])
+    stats['elapsed'] = time.monotonic() - started
+    return stats
+
+
+async def fingerprints(port, calls):
+    """md5 of each call's response body, to check both servers answer alike"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    result = {}
+    for path, token in calls:
+        status, body, keep_alive = await http_get(reader, writer, path, token)
+        result[path, token] = (status, hashlib.md5(body).hexdigest())
+        if not keep_alive:
+            writer.close()
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.close()
+    return result
+
+
+class Command(BaseCommand):
+    help = ('Compare concurrent polling capacity of the WSGI deployment (gunicorn) and the ASGI one '
+            '(gunicorn + uvicorn workers, async read views) on a generated dataset')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Purchase requests in the generated dataset')
+        parser.add_argument('--users', type=int, default=100,
+                            help='Users in the generated dataset')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200],
+                            help='Concurrent polling connections per run')
+        parser.add_argument('--duration', type=float, default=10,
+                            help='Seconds per run')
+        parser.add_argument('--think-time', type=float, default=0,
+                            help='Milliseconds each client waits between polls')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Seconds before a call counts as an error')
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Server worker processes, for both servers')
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Threads per WSGI worker (1 uses the sync worker, as the Dockerfile does)')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        self.options = options
+        connection = connections['default']
+        original = dict(connection.settings_dict)
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, DEBUG='False')
+            try:
+                if connection.vendor == 'sqlite':
+                    # Seed a copy, so the benchmark data never reaches the real database
+                    path = os.path.join(directory, 'benchmark.sqlite3')
+                    with sqlite3.connect(original['NAME']) as src, sqlite3.connect(path) as dst:
+                        src.backup(dst)
+                    use_database(path, original['OPTIONS'])
+                    env['SQLITE_PATH'] = path
+                clients = self.seed()
+            finally:
+                use_database(original['NAME'], original['OPTIONS'])
+
+            servers = {
+                'wsgi': (['backend.wsgi:application', '--threads', str(options['threads'])],
+                         dict(env, ASYNC_READ_VIEWS='False')),
+                'asgi': (['backend.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+                         dict(env, ASYNC_READ_VIEWS='True')),
+            }
+            results, answers = {}, {}
+            for name, (arguments, server_env) in servers.items():
+                with self.server(name, arguments, server_env, directory):
+                    distinct = list(dict.fromkeys(call for calls in clients for call in calls))
+                    answers[name] = asyncio.run(fingerprints(options['port'], distinct))
+                    for concurrency in options['concurrency']:
+                        self.stdout.write(f'{name}: {concurrency} clients for {options["duration"]:g}s...')
+                        results[name, concurrency] = asyncio.run(load(
+                            options['port'], [clients[i % len(clients)] for i in range(concurrency)],
+                            options['duration'], options['think_time'], options['timeout'],
+                        ))
+
+        self.report(results)
+        mismatched = [call for call in answers['wsgi'] if answers['wsgi'][call] != answers['asgi'][call]]
+        if mismatched:
+            raise CommandError(f"ASGI responses differ from WSGI for: {', '.join(sorted({p for p, _ in mismatched}))}")
+        self.stdout.write(self.style.SUCCESS(f'Both servers returned identical responses for {len(answers["wsgi"])} calls'))
+
+    def seed(self):
+        """One call list per polling client: (path, token) for a user of each role"""
+        options = self.options
+        generator = DatasetGenerator(seed=options['seed'], prefix='asgibench')
+        if generator.exists():
+            self.stdout.write("Reusing the users prefixed 'asgibench_'")
+            users = {
+                role: list(User.objects.filter(username__startswith=f'asgibench_{role}_')
+                           .order_by('id').values_list('id', flat=True))
+                for role in POLLS
+            }
+        else:
+            self.stdout.write(f"Generating {options['requests']} requests for {options['users']} users...")
+            users = generator.create_users(options['users'])
+            generator.create_requests(options['requests'])
+
+        # The busiest staff, as they poll the longest lists
+        users['staff'] = list(
+            PurchaseRequest.objects.filter(created_by__in=users['staff'])
+            .values('created_by').annotate(n=Count('id')).order_by('-n', 'created_by')
+            .values_list('created_by', flat=True)[:10]
+        )
+        if not users['staff']:
+            raise CommandError('The dataset has no requests; raise --requests')
+        accounts = User.objects.in_bulk([pk for role in POLLS for pk in users[role][:10]])
+
+        clients = []
+        for index in range(10):
+            for role, paths in POLLS.items():
+                pks = users[role]
+                if not pks:
+                    continue
+                user = accounts[pks[index % min(len(pks), 10)]]
+                request_id = PurchaseRequest.objects.filter(created_by=user).values_list('id', flat=True).first()
+                token = str(AccessToken.for_user(user))
+                clients.append([(path.format(id=request_id), token) for path in paths])
+        return clients
+
+    def server(self, name, arguments, env, directory):
+        command = self
+
+        class Server:
+            def __enter__(self):
+                self.log = open(os.path.join(directory, f'{name}.log'), 'w+')
+                self.process = subprocess.Popen(
+                    [sys.executable, '-m', 'gunicorn', *arguments,
+                     '--bind', f'127.0.0.1:{command.options["port"]}',
+                     '--workers', str(command.options['workers']), '--log-level', 'warning'],
+                    cwd=settings.BASE_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT,
+                )
+                deadline = time.monotonic() + 30
+                while True:
+                    if self.process.poll() is not None or time.monotonic() > deadline:
+                        self.stop()
+                        self.log.seek(0)
+                        raise CommandError(f'{name} server did not start:\n{self.log.read()[-2000:]}')
+                    try:
+                        socket.create_connection(('127.0.0.1', command.options['port']), timeout=1).close()
+                        return self
+                    except OSError:
+                        time.sleep(0.2)
+
+            def stop(self):
+                self.process.terminate()
+                try:
+                    self.process.wait(10)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+
+            def __exit__(self, *exc_info):
+                self.stop()
+                self.log.close()
+
+        return Server()
+
+    def report(self, results):
+        options = self.options
+        self.stdout.write('='*78)
+        self.stdout.write(f"WSGI vs ASGI POLLING CAPACITY ({options['workers']} workers, "
+                          f"{options['duration']:g}s per run, {options['think_time']:g} ms think time)")
+        self.stdout.write('='*78)
+        self.stdout.write(f"{'server':<8}{'clients':>8}{'calls':>8}{'errors':>8}{'calls/s':>10}"
+                          f"{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}")
+        for (name, concurrency), stats in results.items():
+            latencies = stats['latencies'] or [0]
+            self.stdout.write(
+                f"{name:<8}{concurrency:>8}{len(stats['latencies']):>8}{stats['errors']:>8}"
+                f"{len(stats['latencies']) / stats['elapsed']:>10.1f}"
+                f"{percentile(latencies, 50):>12.1f}{percentile(latencies, 95):>12.1f}{percentile(latencies, 99):>12.1f}"
+            )
+        self.stdout.write('='*78)
@@ -0,0 +1,66 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from requests.benchmarking import generate_dataset, rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure bulk purchase request creation throughput (everything is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, nargs='+', default=[1000, 10000],
+                            help='Total items per batch')
+        parser.add_argument('--items-per-request', type=int, default=10)
+
+    def handle(self, *args, **options):
+        per_request = options['items_per_request']
+        results = []
+        with rolled_back():
+            generator = generate_dataset('bulkbench', users=5)
+            user = User.objects.get(pk=generator.users['staff'][0])
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            for total_items in options['items']:
+                results.append(self.run_batch(client, total_items, per_request))
+
+        self.stdout.write('='*70)
+        self.stdout.write('BULK CREATE THROUGHPUT:')
+        self.stdout.write('='*70)
+        for requests, items, elapsed, queries in results:
+            self.stdout.write(
+                f'{requests:>6} requests / {items:>6} items: {elapsed:7.3f}s, '
+                f'{items / elapsed:>9.0f} items/s, {queries} queries'
+            )
+        self.stdout.write('='*70)
+
+    def run_batch(self, client, total_items, per_request):
+        n_requests = max(1, total_items // per_request)
+        payload = [
+            {
+                'title': f'Bulk request {i}',
+                'description': 'Bulk create benchmark',
+                'amount': '100.00',
+                'items': [
+                    {'item_name': f'Item {j}', 'quantity': 1, 'price': '10.00'}
+                    for j in range(per_request)
+                ],
+            }
+            for i in range(n_requests)
+        ]
+        body = json.dumps(payload)
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/request/requests/bulk_create/', body,
+                                    content_type='application/json')
+        elapsed = time.perf_counter() - started
+        if response.status_code != 201:
+            raise CommandError(f'bulk_create returned {response.status_code}: {response.content[:200]}')
+        return n_requests, n_requests * per_request, elapsed, len(queries)
@@ -0,0 +1,134 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from requests.conditional import LIST_VERSION
+from requests.benchmarking import generate_dataset, rolled_back
+from requests.models import PurchaseRequest, Approval
+from requests.pagination import keyset_filter
+
+
+class Command(BaseCommand):
+    help = 'Seed a large dataset and compare query plans and timings of the list access paths with and without the workload indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000,
+                            help='Purchase requests to generate')
+        parser.add_argument('--users', type=int, default=250,
+                            help='Users across all roles (most of them staff) to spread the requests over')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per query (median is reported)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--plans', action='store_true',
+                            help='Print the full query plans')
+
+    def handle(self, *args, **options):
+        self.options = options
+        with rolled_back():
+            users = self.seed()
+            with rolled_back():
+                self.drop_workload_indexes()
+                before = self.measure(users, 'before')
+            after = self.measure(users, 'after')
+
+        self.stdout.write('\n' + '='*78)
+        self.stdout.write(f"INDEX BENCHMARK ({options['requests']} requests, {connection.vendor})")
+        self.stdout.write('='*78)
+        self.stdout.write(f"{'access path':<28}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+        for name in after:
+            b, a = before[name]['ms'], after[name]['ms']
+            speedup = f'{b / a:.1f}x' if a else '-'
+            self.stdout.write(f'{name:<28}{b:>14.2f}{a:>14.2f}{speedup:>10}')
+        self.stdout.write('='*78)
+        for name in after:
+            self.stdout.write(f'\n{name}')
+            self.stdout.write(f"  before: {self.summarize(before[name]['plan'])}")
+            self.stdout.write(f"  after:  {self.summarize(after[name]['plan'])}")
+
+    def seed(self):
+        self.stdout.write(f"Seeding {self.options['requests']} purchase requests...")
+        start = time.perf_counter()
+        generator = generate_dataset(
+            'indexbench', self.options['users'], self.options['requests'], seed=self.options['seed'],
+            days=3 * 365, batch_size=self.options['batch_size']
+        )
+        self.stdout.write(f'Seeded in {time.perf_counter() - start:.1f}s')
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        # The generator gives the first staff member the most requests
+        return {'staff': generator.users['staff'][0], 'approver1': generator.users['approver1'][0]}
+
+    def access_paths(self, users):
+        midpoint = timezone.now() - timedelta(days=365)
+        return {
+            'staff own requests': PurchaseRequest.objects.filter(created_by=users['staff']),
+            'approver1 queue': PurchaseRequest.objects.filter(status='pending_l1'),
+            'approver2 queue': PurchaseRequest.objects.filter(status='pending_l2'),
+            'finance approved': PurchaseRequest.objects.filter(status='approved'),
+            'finance purchase orders': PurchaseRequest.objects.filter(status='approved', purchase_order_file__gt=''),
+            'my approvals': PurchaseRequest.objects.filter(approvals__approver=users['approver1']).distinct(),
+            'admin deep cursor page': keyset_filter(PurchaseRequest.objects.all(), midpoint, 0),
+        }
+
+    def version_paths(self, users):
+        """The conditional GET validator aggregate (see conditional.list_etag) of the polled lists"""
+        return {
+            'staff list version': PurchaseRequest.objects.filter(created_by=users['staff']),
+            'approver1 queue version': PurchaseRequest.objects.filter(status='pending_l1'),
+            'finance list version': PurchaseRequest.objects.filter(status='approved'),
+            'admin list version': PurchaseRequest.objects.all(),
+        }
+
+    def measure(self, users, phase):
+        queries = {}
+        for name, queryset in self.access_paths(users).items():
+            page = queryset[:20]
+            queries[name] = (lambda page=page: list(page.all()), page.query.sql_with_params())
+        for name, queryset in self.version_paths(users).items():
+            aggregate = lambda queryset=queryset: queryset.order_by().aggregate(**LIST_VERSION)
+            # aggregate() runs at once, so take its SQL from the executed statement
+            with CaptureQueriesContext(connection) as captured:
+                aggregate()
+            queries[name] = (aggregate, (captured[-1]['sql'], ()))
+
+        results = {}
+        for name, (run, (sql, params)) in queries.items():
+            timings = []
+            for _ in range(self.options['repeat']):
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+            plan = self.explain(sql, params, phase)
+            if self.options['plans']:
+                self.stdout.write(f'\n-- {name} ({phase})\n{plan}')
+            results[name] = {'ms': statistics.median(timings), 'plan': plan}
+        return results
+
+    def explain(self, sql, params, phase):
+        # The trailing comment keeps SQLite from reusing the plan it cached for
+        # the same statement before the indexes were dropped or restored.
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} -- {phase}', params)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+    def drop_workload_indexes(self):
+        # Plain DROP INDEX statements: the SQLite schema editor can't be
+        # entered inside the transaction that later rolls the drop back.
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in (PurchaseRequest, Approval):
+                for index in model._meta.indexes:
+                    cursor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name': editor.quote_name(index.name),
+                    })
+
+    def summarize(self, plan):
+        return ' | '.join(line.strip() for line in plan.splitlines() if line.strip())[:200]
@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from finance.serializers import PurchaseOrderSerializer
+from requests import fastread
+from requests.benchmarking import generate_dataset, rolled_back
+from requests.models import PurchaseRequest
+from requests.serializers import PurchaseRequestSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare the serializer and fast read paths on large pages (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Purchase requests per page')
+        parser.add_argument('--items', type=int, default=3,
+                            help='Average items per request')
+        parser.add_argument('--users', type=int, default=100,
+                            help='Users across all roles to generate')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed runs per path (median is reported)')
+
+    def handle(self, *args, **options):
+        self.options = options
+        results = []
+        with rolled_back():
+            generator = generate_dataset(
+                'serialbench', options['users'], options['rows'], seed=options['seed'],
+                items_per_request=options['items']
+            )
+            generated = PurchaseRequest.objects.filter(created_by__in=generator.users['staff'])
+            request = Request(RequestFactory().get('/api/request/requests/'))
+            cases = [
+                ('requests list', PurchaseRequestSerializer, {'request': request}, generated.with_items()),
+                ('finance approved', PurchaseOrderSerializer, {},
+                 generated.filter(status='approved').with_receipt_validation()),
+            ]
+            for name, serializer_class, context, queryset in cases:
+                results.append((name, *self.compare(serializer_class, context, queryset)))
+
+        self.stdout.write('='*78)
+        self.stdout.write(f"SERIALIZATION BENCHMARK ({options['rows']} rows, "
+                          f"{'orjson' if fastread.orjson else 'stdlib json'} encoder)")
+        self.stdout.write('='*78)
+        self.stdout.write(f"{'endpoint':<20}{'rows':>8}{'serializer (ms)':>18}{'fast (ms)':>12}{'speedup':>10}{'bytes':>10}")
+        for name, rows, regular, fast, size in results:
+            self.stdout.write(f'{name:<20}{rows:>8}{regular:>18.1f}{fast:>12.1f}{regular / fast:>9.1f}x{size:>10}')
+        self.stdout.write('='*78)
+        self.stdout.write(self.style.SUCCESS('Fast path output is byte-identical'))
+
+    def compare(self, serializer_class, context, queryset):
+        def regular():
+            return JSONRenderer().render(serializer_class(queryset.all(), many=True, context=context).data)
+
+        def fast():
+            plan = fastread.compile_plan(serializer_class(context=context))
+            if plan is None:
+                raise CommandError(f'{serializer_class.__name__} is not supported by the fast path')
+            return fastread.render(plan.rows(plan.values(queryset.all())), stdlib=plan.has_large_floats())
+
+        expected, regular_ms = self.time(regular)
+        actual, fast_ms = self.time(fast)
+        if actual != expected:
+            raise CommandError(f'{serializer_class.__name__}: fast path output differs')
+        return queryset.count(), regular_ms, fast_ms, len(actual)
+
+    def time(self, function):
+        timings = []
+        for _ in range(self.options['repeat']):
+            start = time.perf_counter()
+            content = function()
+            timings.append((time.perf_counter() - start) * 1000)
+        return content, statistics.median(timings)
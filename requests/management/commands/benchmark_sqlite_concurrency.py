@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from requests import counters
+from requests.models import PurchaseRequest
+
+User = get_user_model()
+
+# Connection OPTIONS per profile: Django's SQLite defaults vs the tuned profile
+PROFILES = {
+    'default': lambda: {},
+    'tuned': lambda: settings.SQLITE_TUNED_OPTIONS,
+}
+
+
+def use_database(path, options):
+    """Point the default connection of this process at the benchmark copy"""
+    connection = connections['default']
+    connection.close()
+    connection.settings_dict.update(NAME=path, OPTIONS=dict(options))
+
+
+def approval_calls(ids, bulk_size):
+    """(url, payload) per write: one approve call per id, or bulk_decide batches"""
+    if not bulk_size:
+        return [(f'/api/request/requests/{pk}/approve/', {'comment': 'Load test'}) for pk in ids]
+    return [
+        ('/api/request/requests/bulk_decide/', {'ids': ids[i:i + bulk_size], 'action': 'approve'})
+        for i in range(0, len(ids), bulk_size)
+    ]
+
+
+def worker(path, options, token, calls, reads, barrier, results):
+    use_database(path, options)
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    latencies, locked, failed, approved = [], 0, 0, 0
+    barrier.wait()
+    started = time.monotonic()
+    for url, payload in calls:
+        start = time.perf_counter()
+        try:
+            response = client.post(url, payload, content_type='application/json')
+            for _ in range(reads):
+                client.get('/api/request/requests/')
+        except OperationalError as exc:
+            if 'locked' in str(exc):
+                locked += 1
+            else:
+                failed += 1
+            continue
+        if response.status_code == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+            approved += len(payload.get('ids', [None]))
+        else:
+            failed += 1
+    results.put({'started': started, 'finished': time.monotonic(), 'approved': approved,
+                 'latencies': latencies, 'locked': locked, 'failed': failed})
+    connections['default'].close()
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent approvals from several processes against SQLite with the default and tuned profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Concurrent worker processes')
+        parser.add_argument('--approvals', type=int, default=100,
+                            help='Approvals per worker')
+        parser.add_argument('--reads', type=int, default=1,
+                            help='Request list reads after each approval')
+        parser.add_argument('--bulk-size', type=int, default=0,
+                            help='Approve through bulk_decide in batches of this size (read-then-write transactions)')
+        parser.add_argument('--profiles', default='default,tuned',
+                            help=f"Comma-separated profiles to compare ({', '.join(PROFILES)})")
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('This benchmark needs the SQLite backend')
+        profiles = [name.strip() for name in options['profiles'].split(',')]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+        if 'tuned' in profiles and not hasattr(settings, 'SQLITE_TUNED_OPTIONS'):
+            raise CommandError('SQLITE_TUNED_OPTIONS is not configured')
+
+        source = connections['default'].settings_dict['NAME']
+        original = dict(connections['default'].settings_dict)
+        results = {}
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for name in profiles:
+                    path = os.path.join(directory, f'{name}.sqlite3')
+                    self.stdout.write(f'Profile {name}: copying the database and seeding...')
+                    results[name] = self.run(source, path, PROFILES[name](), options)
+        finally:
+            use_database(original['NAME'], original['OPTIONS'])
+
+        self.stdout.write('='*78)
+        self.stdout.write(f"SQLITE CONCURRENCY ({options['workers']} workers x {options['approvals']} approvals"
+                          f"{f' in batches of ' + str(options['bulk_size']) if options['bulk_size'] else ''}, "
+                          f"{options['reads']} read(s) per write)")
+        self.stdout.write('='*78)
+        self.stdout.write(f"{'profile':<10}{'calls':>7}{'locked':>8}{'failed':>8}{'approvals/s':>13}"
+                          f"{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}")
+        for name, result in results.items():
+            latencies = sorted(result['latencies']) or [0]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"{name:<10}{len(result['latencies']):>7}{result['locked']:>8}{result['failed']:>8}"
+                f"{result['approvals'] / result['elapsed']:>13.1f}"
+                f"{statistics.median(latencies):>10.1f}{p95:>10.1f}{latencies[-1]:>10.1f}"
+            )
+        self.stdout.write('='*78)
+
+    def run(self, source, path, profile_options, options):
+        # Each profile starts from its own copy, so runs don't interfere
+        with sqlite3.connect(source) as src, sqlite3.connect(path) as dst:
+            src.backup(dst)
+        use_database(path, profile_options)
+        ids, token = self.seed(options['workers'] * options['approvals'])
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(options['workers'])
+        queue = context.Queue()
+        per_worker = options['approvals']
+        processes = [
+            context.Process(target=worker, args=(
+                path, profile_options, token,
+                approval_calls(ids[i * per_worker:(i + 1) * per_worker], options['bulk_size']),
+                options['reads'], barrier, queue,
+            ))
+            for i in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        reports = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        return {
+            'latencies': [latency for report in reports for latency in report['latencies']],
+            'approvals': sum(report['approved'] for report in reports),
+            'locked': sum(report['locked'] for report in reports),
+            'failed': sum(report['failed'] for report in reports),
+            'elapsed': max(r['finished'] for r in reports) - min(r['started'] for r in reports),
+        }
+
+    def seed(self, count):
+        staff = User.objects.create_user(username='sqlitebench_staff', email='sqlitebench_staff@example.com',
+                                         password=None, role='staff')
+        approver = User.objects.create_user(username='sqlitebench_approver1',
+                                            email='sqlitebench_approver1@example.com',
+                                            password=None, role='approver1')
+        requests = PurchaseRequest.objects.bulk_create([
+            PurchaseRequest(title=f'Concurrency bench {i}', description='SQLite concurrency fixture',
+                            amount=Decimal('100.00'), created_by=staff, status='pending_l1')
+            for i in range(count)
+        ], batch_size=500)
+        counters.record((staff.id, None, 'pending_l1') for _ in requests)
+        return [request.id for request in requests], str(AccessToken.for_user(approver))
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
+
+from requests.datagen import ROLE_WEIGHTS, DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = 'Generate a reproducible synthetic dataset (users, requests, items, approvals, receipts) for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500,
+                            help='Users to create across all roles')
+        parser.add_argument('--requests', type=int, default=100000,
+                            help='Purchase requests to create')
+        parser.add_argument('--items-per-request', type=int, default=3,
+                            help='Average items per request')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread creation dates over this many days')
+        parser.add_argument('--end-date', help='Last creation date, YYYY-MM-DD (default: today)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='load',
+                            help='Username prefix of the generated users')
+        parser.add_argument('--password',
+                            help='Password for every generated user (default: unusable)')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Requests per insert transaction')
+
+    def handle(self, *args, **options):
+        end = None
+        if options['end_date']:
+            end = parse_date(options['end_date'])
+            if end is None:
+                raise CommandError('--end-date must be YYYY-MM-DD')
+        if options['users'] < len(ROLE_WEIGHTS) or options['requests'] < 0 \
+                or options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--users must cover every role; sizes and --days must be positive')
+
+        generator = DatasetGenerator(
+            seed=options['seed'], prefix=options['prefix'], end=end, days=options['days'],
+            batch_size=options['batch_size'], password=options['password'],
+        )
+        if generator.exists():
+            raise CommandError(f"Users prefixed '{options['prefix']}_' already exist; choose another --prefix")
+
+        start = time.perf_counter()
+        generator.create_users(options['users'])
+        self.stdout.write(f"Created {options['users']} users")
+
+        step = max(options['requests'] // 10, 1)
+        reported = [0]
+
+        def progress(done):
+            if done - reported[0] >= step or done == options['requests']:
+                reported[0] = done
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"  {done}/{options['requests']} requests ({done / elapsed:.0f}/s)")
+
+        created = generator.create_requests(options['requests'], options['items_per_request'], progress)
+        elapsed = time.perf_counter() - start
+
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        rows = sum(created.values())
+        self.stdout.write('='*50)
+        self.stdout.write(f"DATASET (seed {options['seed']}, prefix '{options['prefix']}')")
+        self.stdout.write('='*50)
+        for name, count in created.items():
+            self.stdout.write(f'{name:<22}{count:>12}')
+        self.stdout.write(f'Elapsed: {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)')
+        self.stdout.write('='*50)
+        self.stdout.write(self.style.SUCCESS('Dataset generated'))
@@ -0,0 +1,230 @@
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from requests import counters
+from requests.bulk import keep_timestamps
+from requests.models import Approval, ImportCheckpoint, PurchaseRequest, RequestItem
+
+User = get_user_model()
+
+REQUEST_STATUSES = {status for status, _ in PurchaseRequest.STATUS_CHOICES}
+APPROVAL_STATUSES = {status for status, _ in Approval.STATUS_CHOICES}
+OPTIONAL_TEXT = ['department', 'vendor_name', 'category', 'urgency']
+
+
+class InvalidLine(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Import historical purchase requests (with items and approvals) from a JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL file, one purchase request per line')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Requests per insert transaction')
+        parser.add_argument('--max-errors', type=int, default=100,
+                            help='Stop after this many invalid lines (0 for no limit)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore the saved checkpoint and start from the first line')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'File not found: {path}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        source = os.path.abspath(path)
+        if options['restart']:
+            ImportCheckpoint.objects.filter(source=source).delete()
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source)
+        if checkpoint.offset > os.path.getsize(path):
+            raise CommandError(
+                f'Checkpoint is past the end of {path}; the file has changed. Use --restart to import it again.'
+            )
+        if checkpoint.lines:
+            self.stdout.write(f'Resuming {path} after line {checkpoint.lines} '
+                              f'({checkpoint.imported} requests already imported)')
+
+        self.users = self.load_users()
+        self.errors = 0
+        self.max_errors = options['max_errors']
+        start_lines, start_imported = checkpoint.lines, checkpoint.imported
+        started = time.perf_counter()
+
+        batch = []
+        with open(path, 'rb') as handle:
+            handle.seek(checkpoint.offset)
+            offset, lines = checkpoint.offset, checkpoint.lines
+            for raw in handle:
+                offset += len(raw)
+                lines += 1
+                if not raw.strip():
+                    continue
+                try:
+                    batch.append(self.parse(raw))
+                except InvalidLine as exc:
+                    checkpoint.skipped += 1
+                    self.invalid(checkpoint, lines, exc)
+                if len(batch) >= options['batch_size']:
+                    self.save_batch(checkpoint, batch, offset, lines)
+                    batch = []
+                    self.progress(checkpoint, start_imported, started)
+            self.save_batch(checkpoint, batch, offset, lines)
+
+        elapsed = time.perf_counter() - started
+        imported = checkpoint.imported - start_imported
+        self.stdout.write('='*50)
+        self.stdout.write('IMPORT SUMMARY')
+        self.stdout.write('='*50)
+        self.stdout.write(f'Lines read: {checkpoint.lines - start_lines}')
+        self.stdout.write(f'Requests imported: {imported}')
+        self.stdout.write(f'Lines skipped: {self.errors}')
+        self.stdout.write(f'Elapsed: {elapsed:.1f}s ({imported / elapsed if elapsed else 0:.0f} requests/s)')
+        self.stdout.write(f'Total imported from this file: {checkpoint.imported}')
+        self.stdout.write('='*50)
+        self.stdout.write(self.style.SUCCESS('Import complete'))
+
+    def load_users(self):
+        """username and lower-cased email -> user id, loaded once"""
+        users = {}
+        for pk, username, email in User.objects.values_list('id', 'username', 'email').iterator():
+            users[username] = pk
+            if email:
+                users[email.lower()] = pk
+        return users
+
+    def user_id(self, reference, key):
+        if not isinstance(reference, str) or not reference:
+            raise InvalidLine(f'{key} is required')
+        pk = self.users.get(reference) or self.users.get(reference.lower())
+        if pk is None:
+            raise InvalidLine(f'unknown user {reference!r} in {key}')
+        return pk
+
+    def parse(self, raw):
+        """One line -> (request, items, approvals), unsaved"""
+        try:
+            data = json.loads(raw)
+        except ValueError as exc:
+            raise InvalidLine(f'invalid JSON: {exc}')
+        if not isinstance(data, dict):
+            raise InvalidLine('expected a JSON object')
+
+        title = data.get('title')
+        if not isinstance(title, str) or not title.strip():
+            raise InvalidLine('title is required')
+        status = data.get('status', 'pending_l1')
+        if status not in REQUEST_STATUSES:
+            raise InvalidLine(f'invalid status {status!r}')
+        created_at = self.datetime(data.get('created_at'), 'created_at') or timezone.now()
+
+        purchase_request = PurchaseRequest(
+            title=title[:200],
+            description=data.get('description') or '',
+            amount=self.decimal(data.get('amount'), 'amount'),
+            quantity=self.integer(data.get('quantity', 1), 'quantity'),
+            status=status,
+            created_by_id=self.user_id(data.get('created_by'), 'created_by'),
+            created_at=created_at,
+            updated_at=self.datetime(data.get('updated_at'), 'updated_at') or created_at,
+            **{name: data.get(name) or None for name in OPTIONAL_TEXT},
+        )
+
+        items = []
+        for item in data.get('items') or []:
+            if not isinstance(item, dict) or not item.get('item_name'):
+                raise InvalidLine('items need an item_name')
+            items.append(RequestItem(
+                item_name=str(item['item_name'])[:200],
+                price=self.decimal(item.get('price'), 'items.price'),
+                quantity=self.integer(item.get('quantity', 1), 'items.quantity'),
+            ))
+
+        approvals, levels = [], set()
+        for approval in data.get('approvals') or []:
+            if not isinstance(approval, dict):
+                raise InvalidLine('approvals must be objects')
+            level = approval.get('level')
+            if type(level) is not int or level not in (1, 2) or level in levels:
+                raise InvalidLine(f'invalid or repeated approval level {level!r}')
+            levels.add(level)
+            if approval.get('status') not in APPROVAL_STATUSES:
+                raise InvalidLine(f"invalid approval status {approval.get('status')!r}")
+            approvals.append(Approval(
+                level=level,
+                status=approval['status'],
+                approver_id=self.user_id(approval.get('approver'), 'approvals.approver'),
+                comment=approval.get('comment') or '',
+                date=self.datetime(approval.get('date'), 'approvals.date') or created_at,
+            ))
+        return purchase_request, items, approvals
+
+    def decimal(self, value, key):
+        try:
+            value = Decimal(str(value))
+        except InvalidOperation:
+            raise InvalidLine(f'{key} must be a number')
+        if not value.is_finite() or abs(value) >= 10**8:
+            raise InvalidLine(f'{key} is out of range')
+        return value.quantize(Decimal('0.01'))
+
+    def integer(self, value, key):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise InvalidLine(f'{key} must be a non-negative integer')
+        return value
+
+    def datetime(self, value, key):
+        if value in (None, ''):
+            return None
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+        if parsed is None:
+            raise InvalidLine(f'{key} must be an ISO 8601 datetime')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def invalid(self, checkpoint, line, exc):
+        self.errors += 1
+        self.stderr.write(f'Line {line}: {exc}')
+        if self.max_errors and self.errors >= self.max_errors:
+            raise CommandError(
+                f'Stopped after {self.errors} invalid lines; '
+                f'rerun to resume after line {checkpoint.lines}'
+            )
+
+    def save_batch(self, checkpoint, batch, offset, lines):
+        """Insert one batch and advance the checkpoint in the same transaction"""
+        with transaction.atomic(), keep_timestamps(PurchaseRequest, Approval):
+            requests = PurchaseRequest.objects.bulk_create([request for request, _, _ in batch])
+            items, approvals = [], []
+            for request, request_items, request_approvals in batch:
+                for child in request_items:
+                    child.purchase_request = request
+                for child in request_approvals:
+                    child.purchase_request = request
+                items.extend(request_items)
+                approvals.extend(request_approvals)
+            RequestItem.objects.bulk_create(items, batch_size=1000)
+            Approval.objects.bulk_create(approvals, batch_size=1000)
+            counters.record((request.created_by_id, None, request.status) for request in requests)
+
+            checkpoint.offset = offset
+            checkpoint.lines = lines
+            checkpoint.imported += len(requests)
+            checkpoint.save()
+
+    def progress(self, checkpoint, start_imported, started):
+        elapsed = time.perf_counter() - started
+        imported = checkpoint.imported - start_imported
+        self.stdout.write(f'  line {checkpoint.lines}: {imported} imported '
+                          f'({imported / elapsed if elapsed else 0:.0f} requests/s)')
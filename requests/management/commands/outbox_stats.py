@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from requests import outbox
+
+
+class Command(BaseCommand):
+    help = 'Show outbox event counts and dispatch lag, optionally retrying failed events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Queue failed events again with fresh attempts')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            self.stdout.write(f'Queued {outbox.retry_failed()} failed events again')
+
+        metrics = outbox.metrics()
+        self.stdout.write('='*50)
+        self.stdout.write('OUTBOX:')
+        self.stdout.write('='*50)
+        for status in ('pending', 'running', 'done', 'failed'):
+            self.stdout.write(f'{status:<10}{metrics[status]:>10}')
+        self.stdout.write(f"Oldest undispatched event: {metrics['oldest_pending_age']:.1f}s old")
+        if metrics['processed_last_5m']:
+            self.stdout.write(
+                f"Last 5 minutes: {metrics['processed_last_5m']} dispatched, lag p50 "
+                f"{metrics['lag_p50_last_5m']:.2f}s, max {metrics['lag_max_last_5m']:.2f}s"
+            )
+        else:
+            self.stdout.write('Last 5 minutes: nothing dispatched')
+        self.stdout.write('='*50)
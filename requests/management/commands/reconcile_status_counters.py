@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from requests import counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-status request counters from the purchase_requests table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report counters that drifted, without rebuilding')
+
+    def handle(self, *args, **options):
+        before = counters.counts()
+        if options['check']:
+            after = counters.counts_from_table()
+        else:
+            rows = counters.rebuild()
+            after = counters.counts()
+            self.stdout.write(f'Rebuilt {rows} counter rows')
+
+        self.stdout.write('='*50)
+        self.stdout.write('STATUS COUNTERS:')
+        self.stdout.write('='*50)
+        drifted = 0
+        for status, count in after.items():
+            line = f'{status:<15} {before[status]:>8} -> {count:>8}'
+            if before[status] != count:
+                drifted += 1
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(line)
+        self.stdout.write('='*50)
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'{drifted} overall counter(s) had drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Counters match the table'))
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from documents.services import jobs
+from requests import outbox
+
+
+class Command(BaseCommand):
+    help = 'Run the handlers of pending outbox events (workflow side effects) in batches, with retries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Events claimed per round (defaults to OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when no event is due')
+        parser.add_argument('--once', action='store_true',
+                            help='Dispatch the due events and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or settings.OUTBOX_BATCH_SIZE
+        worker_id = jobs.new_worker_id()
+
+        self.stdout.write(f'Outbox dispatcher {worker_id} started')
+        processed = failed = 0
+        while True:
+            close_old_connections()
+            outbox.requeue_stale()
+            claimed = outbox.claim(worker_id, batch_size)
+            if not claimed:
+                purged = outbox.purge()
+                if purged:
+                    self.stdout.write(f'Purged {purged} done events')
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            done, errors = outbox.dispatch(claimed)
+            processed += len(done)
+            failed += len(errors)
+            lag = [(event.processed_at - event.created_at).total_seconds() for event in done]
+            self.stdout.write(
+                f'Dispatched {len(done)} events' + (f', max lag {max(lag):.2f}s' if lag else '')
+            )
+            for event in errors:
+                outcome = 'gave up' if event.status == 'failed' else f'retry at {event.available_at:%H:%M:%S}'
+                self.stdout.write(self.style.ERROR(
+                    f'Event {event.id} ({event.topic}) failed, attempt {event.attempts} ({outcome}): {event.error}'
+                ))
+
+        self.stdout.write(self.style.SUCCESS(f'Dispatched {processed} events, {failed} failures'))
@@ -0,0 +1,55 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+
+class Command(BaseCommand):
+    help = 'Wait until the database accepts connections, then report how connections are managed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='Seconds to keep retrying before failing')
+        parser.add_argument('--interval', type=float, default=1,
+                            help='Seconds between attempts')
+
+    def handle(self, *args, **options):
+        try:
+            connection = connections[options['database']]
+        except ImproperlyConfigured as exc:
+            # A missing driver won't appear by waiting
+            raise CommandError(str(exc))
+        deadline = time.monotonic() + options['timeout']
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                connection.ensure_connection()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                break
+            except OperationalError as exc:
+                exc = str(exc).strip().splitlines()[0]
+                if time.monotonic() >= deadline:
+                    raise CommandError(f'Database unavailable after {attempts} attempts: {exc}')
+                self.stdout.write(f'Database unavailable ({exc}); retrying in {options["interval"]:g}s...')
+                connection.close()
+                time.sleep(options['interval'])
+
+        settings_dict = connection.settings_dict
+        pool = settings_dict['OPTIONS'].get('pool')
+        if pool:
+            pooling = f"pool of {pool.get('min_size', 4)}-{pool.get('max_size', 'unbounded')} connections"
+        elif settings_dict['CONN_MAX_AGE']:
+            pooling = f"persistent connections for {settings_dict['CONN_MAX_AGE']}s"
+        else:
+            pooling = 'a new connection per request'
+        if settings_dict['CONN_HEALTH_CHECKS']:
+            pooling += ', health checked'
+        self.stdout.write(self.style.SUCCESS(
+            f"Database '{options['database']}' is available "
+            f'({connection.vendor} {connection.Database.__name__}, {pooling})'
+        ))
+        connection.close()
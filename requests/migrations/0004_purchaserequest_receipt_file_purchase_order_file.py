@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-17 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0003_purchaserequest_category_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaserequest',
+            name='purchase_order_file',
+            field=models.FileField(blank=True, null=True, upload_to='purchase_orders/'),
+        ),
+        migrations.AddField(
+            model_name='purchaserequest',
+            name='receipt_file',
+            field=models.FileField(blank=True, null=True, upload_to='receipts/'),
+        ),
+    ]
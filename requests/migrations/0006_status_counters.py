@@ -0,0 +1,42 @@
+# Generated by Django 5.1 on 2026-10-17 15:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    PurchaseRequest = apps.get_model('requests', 'PurchaseRequest')
+    StatusCounter = apps.get_model('requests', 'StatusCounter')
+    overall = {}
+    rows = []
+    for row in PurchaseRequest.objects.order_by().values('created_by', 'status').annotate(n=Count('id')):
+        overall[row['status']] = overall.get(row['status'], 0) + row['n']
+        rows.append(StatusCounter(owner_id=row['created_by'], status=row['status'], count=row['n']))
+    rows.extend(StatusCounter(owner=None, status=status, count=n) for status, n in overall.items())
+    StatusCounter.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0005_workload_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending_l1', 'Pending L1'), ('rejected_l1', 'Rejected L1'), ('pending_l2', 'Pending L2'), ('rejected_l2', 'Rejected L2'), ('approved', 'Approved'), ('ordered', 'Ordered'), ('delivered', 'Delivered'), ('completed', 'Completed')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'status'), name='status_counter_owner_uniq'), models.UniqueConstraint(condition=models.Q(('owner__isnull', True)), fields=('status',), name='status_counter_overall_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,42 @@
 from django.db import models
+from django.db.models import Prefetch, Q
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
+from django.utils import timezone
+
+from . import counters, outbox, transitions
+
+
+class PurchaseRequestQuerySet(models.QuerySet):
+    """Preloads the relations the request serializers read, one query per relation"""
+
+    def with_items(self):
+        return self.select_related('created_by').prefetch_related('items')
+
+    def with_approvals(self):
+        return self.prefetch_related(
+            Prefetch('approvals', queryset=Approval.objects.select_related('approver'))
+        )
+
+    def with_receipt_validation(self):
+        return self.select_related('created_by', 'receipt_validation')
+
+    def visible_to(self, user):
+        """The requests a user's role lists: own for staff, the role's queue
+        for approvers and finance, everything for admins"""
+        if user.role == 'staff':
+            return self.filter(created_by=user)
+        elif user.role == 'approver1':
+            return self.filter(status='pending_l1')
+        elif user.role == 'approver2':
+            return self.filter(status='pending_l2')
+        elif user.role == 'finance':
+            return self.filter(status='approved')
+        elif user.role == 'admin':
+            return self.all()
+        return self.none()
 
 
 class PurchaseRequest(models.Model):
@@ -39,15 +74,75 @@ class PurchaseRequest(models.Model):
         blank=True,
         null=True
     )
+    receipt_file = models.FileField(
+        upload_to='receipts/',
+        blank=True,
+        null=True
+    )
+    purchase_order_file = models.FileField(
+        upload_to='purchase_orders/',
+        blank=True,
+        null=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PurchaseRequestQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        # Matched to the list access paths: admin (all), staff (own), and the
+        # approver and finance queues and issued purchase orders (by status).
+        # The *_updated_idx pair covers the conditional GET validator aggregate
+        # (COUNT, MAX(updated_at), MAX(id); see conditional.list_etag) of the
+        # same lists, so a 304 reads index entries instead of table rows.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='pr_created_idx'),
+            models.Index(fields=['created_by', '-created_at', '-id'], name='pr_owner_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='pr_status_created_idx'),
+            models.Index(fields=['created_by', 'updated_at'], name='pr_owner_updated_idx'),
+            models.Index(fields=['status', 'updated_at'], name='pr_status_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can tell which counter moved
+        instance._stored_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save, moving the status counters and publishing the status change in the same transaction"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' not in update_fields:
+            return super().save(*args, **kwargs)
+        if update_fields is None and not self._state.adding and self.status == getattr(self, '_stored_status', None):
+            # Status only moves through transitions; a copy read before one
+            # ran must not write the status it read back over it
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'status' and field.attname not in deferred
+            ]
+            return super().save(*args, **kwargs)
+
+        adding = self._state.adding
+        with transaction.atomic():
+            if adding:
+                previous = None
+            else:
+                previous = getattr(self, '_stored_status', None)
+                if previous is None:
+                    previous = type(self).objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            super().save(*args, **kwargs)
+            if previous != self.status:
+                counters.record([(self.created_by_id, previous, self.status)])
+                outbox.publish_status_changes([(self.pk, self.created_by_id, previous, self.status)])
+        self._stored_status = self.status
+
     def can_edit(self):
         """Check if request can be edited (only pending_l1 status)"""
         return self.status == 'pending_l1'
@@ -61,39 +156,151 @@ class PurchaseRequest(models.Model):
         return False
 
     def approve(self, user, comment=''):
-        """Approve the request"""
-        with transaction.atomic():
-            level = 1 if user.role == 'approver1' else 2
-            Approval.objects.create(
-                purchase_request=self,
-                approver=user,
-                level=level,
-                status='approved',
-                comment=comment
-            )
-
-            if level == 1:
-                self.status = 'pending_l2'
-            elif level == 2:
-                self.status = 'approved'
-            self.save()
+        """Approve the request; raises transitions.Conflict if its status moved since it was read"""
+        transitions.decide(self, user, 'approved', comment)
 
     def reject(self, user, comment=''):
-        """Reject the request"""
+        """Reject the request; raises transitions.Conflict if its status moved since it was read"""
+        transitions.decide(self, user, 'rejected', comment)
+
+    @classmethod
+    def bulk_decide(cls, user, ids, decision, comment='', comments=None):
+        """Approve or reject many requests at the approver's level.
+
+        Eligibility is checked with one query, approvals are bulk inserted
+        and statuses moved with one UPDATE. Returns {id: (outcome, status)}
+        where outcome is 'approved', 'rejected', 'not_found' or 'not_eligible'.
+        """
+        comments = comments or {}
+        level, expected, new_status = transitions.decision(user, decision)
+
+        outcomes = {}
         with transaction.atomic():
-            level = 1 if user.role == 'approver1' else 2
-            Approval.objects.create(
-                purchase_request=self,
-                approver=user,
-                level=level,
-                status='rejected',
-                comment=comment
-            )
-            if level == 1:
-                self.status = 'rejected_l1'
-            elif level == 2:
-                self.status = 'rejected_l2'
-            self.save()
+            current = {
+                request_id: (status, owner_id)
+                for request_id, status, owner_id in cls.objects.select_for_update().filter(
+                    id__in=ids
+                ).values_list('id', 'status', 'created_by_id')
+            }
+            eligible = []
+            for request_id in ids:
+                if request_id not in current:
+                    outcomes[request_id] = ('not_found', None)
+                elif current[request_id][0] != expected:
+                    outcomes[request_id] = ('not_eligible', current[request_id][0])
+                else:
+                    eligible.append(request_id)
+                    outcomes[request_id] = (decision, new_status)
+
+            if eligible:
+                Approval.objects.bulk_create([
+                    Approval(
+                        purchase_request_id=request_id,
+                        approver=user,
+                        level=level,
+                        status=decision,
+                        comment=comments.get(request_id, comment)
+                    )
+                    for request_id in eligible
+                ])
+                cls.objects.filter(id__in=eligible, status=expected).update(
+                    status=new_status,
+                    updated_at=timezone.now()
+                )
+                counters.record(
+                    (current[request_id][1], expected, new_status) for request_id in eligible
+                )
+                outbox.publish_status_changes(
+                    (request_id, current[request_id][1], expected, new_status) for request_id in eligible
+                )
+
+        return outcomes
+
+
+class StatusCounter(models.Model):
+    """Request count per status, per owner and overall (owner NULL).
+
+    Maintained by PurchaseRequest.save(), deletes and the bulk paths; rebuilt
+    with the reconcile_status_counters command.
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    status = models.CharField(max_length=20, choices=PurchaseRequest.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'status'], name='status_counter_owner_uniq'),
+            models.UniqueConstraint(
+                fields=['status'],
+                condition=Q(owner__isnull=True),
+                name='status_counter_overall_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id or 'all'} - {self.status}: {self.count}"
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of an import_requests_jsonl run over one source file.
+
+    Saved in the same transaction as each imported batch, so a resumed run
+    starts exactly after the last committed line.
+    """
+    source = models.CharField(max_length=500, unique=True)
+    offset = models.BigIntegerField(default=0)  # bytes consumed
+    lines = models.BigIntegerField(default=0)
+    imported = models.BigIntegerField(default=0)
+    skipped = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: line {self.lines} ({self.imported} imported)"
+
+
+class OutboxEvent(models.Model):
+    """A workflow side effect waiting to run, such as queueing a PO.
+
+    Written in the transaction that makes the change (see outbox) and run by
+    the run_outbox_dispatcher command through the handlers of its topic.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    topic = models.CharField(max_length=100)
+    purchase_request = models.ForeignKey(
+        PurchaseRequest,
+        on_delete=models.CASCADE,
+        related_name='outbox_events'
+    )
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)  # not claimed before (retry backoff)
+    started_at = models.DateTimeField(blank=True, null=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.id} - {self.status}"
 
 
 class Approval(models.Model):
@@ -119,6 +326,9 @@ class Approval(models.Model):
     class Meta:
         unique_together = ['purchase_request', 'level']
         ordering = ['date']
+        indexes = [
+            models.Index(fields=['approver', 'purchase_request'], name='approval_approver_req_idx'),
+        ]
 
     def __str__(self):
         return f"{self.purchase_request.title} - Level {self.level} - {self.status}"
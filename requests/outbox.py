@@ -0,0 +1,201 @@
+"""Transactional outbox for workflow side effects.
+
+Status changes publish an OutboxEvent in the transaction that makes them, so
+an event exists exactly when its change committed and writes never wait on
+side effects. The run_outbox_dispatcher command claims pending events in
+batches and runs the handlers registered for their topic (see handlers).
+A failed event is retried with exponential backoff until
+OUTBOX_MAX_ATTEMPTS, then left as failed.
+
+Delivery is at least once: an event whose handlers partly ran before a
+failure or a dispatcher crash runs again, so handlers must be idempotent.
+Several dispatchers can run side by side; claims skip events another one
+holds. Bulk loads of historical or synthetic data (import_requests_jsonl,
+generate_dataset) publish nothing.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+STATUS_CHANGED = 'request.status_changed'
+
+# topic: [handler(event), ...]
+HANDLERS = defaultdict(list)
+
+
+def handler(topic):
+    """Register the decorated function to run for each event of the topic"""
+    def register(func):
+        HANDLERS[topic].append(func)
+        return func
+    return register
+
+
+def publish_status_changes(changes):
+    """Publish a status_changed event per (request_id, owner_id, old_status,
+    new_status); old_status is None for new requests. Call inside the
+    transaction making the changes."""
+    from .models import OutboxEvent
+
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            topic=STATUS_CHANGED,
+            purchase_request_id=request_id,
+            payload={'owner_id': owner_id, 'from': old_status, 'to': new_status}
+        )
+        for request_id, owner_id, old_status, new_status in changes
+        if old_status != new_status
+    ], batch_size=settings.BULK_CREATE_BATCH_SIZE)
+
+
+def claim(worker_id, limit):
+    """Atomically move up to `limit` due pending events to running for this worker"""
+    from .models import OutboxEvent
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # The status condition keeps two dispatchers from claiming the same
+        # event on backends without SELECT ... FOR UPDATE (SQLite).
+        OutboxEvent.objects.filter(id__in=ids, status='pending').update(
+            status='running',
+            locked_by=worker_id,
+            started_at=now
+        )
+    return list(OutboxEvent.objects.filter(id__in=ids, status='running', locked_by=worker_id))
+
+
+def dispatch(events):
+    """Run the handlers of claimed events. Each event's handlers share a
+    transaction; events that succeed are marked done with one UPDATE and
+    failures are rescheduled. Returns (done, failed) lists of events."""
+    from .models import OutboxEvent
+
+    done, failed = [], []
+    for event in events:
+        try:
+            with transaction.atomic():
+                for func in HANDLERS[event.topic]:
+                    func(event)
+        except Exception as e:
+            fail(event, e)
+            failed.append(event)
+        else:
+            done.append(event)
+
+    if done:
+        now = timezone.now()
+        OutboxEvent.objects.filter(id__in=[event.id for event in done]).update(
+            status='done',
+            attempts=F('attempts') + 1,
+            error='',
+            processed_at=now
+        )
+        for event in done:
+            event.status, event.processed_at = 'done', now
+    return done, failed
+
+
+def retry_delay(attempts):
+    """Seconds before the next try after `attempts` failures: doubling, capped"""
+    return min(settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_DELAY)
+
+
+def fail(event, error):
+    """Record a failure, rescheduling the event until it runs out of attempts"""
+    now = timezone.now()
+    event.attempts += 1
+    event.error = str(error)
+    event.locked_by = ''
+    if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        event.status = 'failed'
+        event.processed_at = now
+    else:
+        event.status = 'pending'
+        event.available_at = now + timedelta(seconds=retry_delay(event.attempts))
+    event.save(update_fields=['status', 'attempts', 'error', 'locked_by', 'available_at', 'processed_at'])
+
+
+def requeue_stale():
+    """Return events whose dispatcher died mid-batch to the queue.
+
+    The crash counts as an attempt, so an event that keeps killing its
+    dispatcher is marked failed after OUTBOX_MAX_ATTEMPTS instead of being
+    claimed forever.
+    """
+    from .models import OutboxEvent
+
+    now = timezone.now()
+    stale = OutboxEvent.objects.filter(
+        status='running', started_at__lt=now - timedelta(seconds=settings.OUTBOX_STALE_AFTER)
+    )
+    with transaction.atomic():
+        failed = stale.filter(attempts__gte=settings.OUTBOX_MAX_ATTEMPTS - 1).update(
+            status='failed',
+            attempts=F('attempts') + 1,
+            error='Dispatcher stopped while running the event',
+            locked_by='',
+            processed_at=now
+        )
+        requeued = stale.update(
+            status='pending',
+            attempts=F('attempts') + 1,
+            locked_by='',
+            available_at=now
+        )
+    return requeued + failed
+
+
+def retry_failed():
+    """Queue failed events again with a fresh set of attempts"""
+    from .models import OutboxEvent
+
+    return OutboxEvent.objects.filter(status='failed').update(
+        status='pending',
+        attempts=0,
+        available_at=timezone.now(),
+        processed_at=None
+    )
+
+
+def purge():
+    """Delete done events older than OUTBOX_RETENTION_DAYS"""
+    from .models import OutboxEvent
+
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(status='done', processed_at__lt=cutoff).delete()
+    return deleted
+
+
+def metrics():
+    """Event counts per status and how far the dispatchers are behind"""
+    from .models import OutboxEvent
+
+    now = timezone.now()
+    result = {status: 0 for status, _ in OutboxEvent.STATUS_CHOICES}
+    result.update(OutboxEvent.objects.order_by().values_list('status').annotate(n=Count('id')))
+    oldest = OutboxEvent.objects.filter(status__in=['pending', 'running']).aggregate(oldest=Min('created_at'))['oldest']
+    result['oldest_pending_age'] = (now - oldest).total_seconds() if oldest else 0
+
+    # Publish-to-done lag of the events processed in the last five minutes
+    delays = sorted(
+        (processed_at - created_at).total_seconds()
+        for created_at, processed_at in OutboxEvent.objects.filter(
+            status='done', processed_at__gte=now - timedelta(minutes=5)
+        ).values_list('created_at', 'processed_at')
+    )
+    result['processed_last_5m'] = len(delays)
+    result['lag_p50_last_5m'] = delays[len(delays) // 2] if delays else None
+    result['lag_max_last_5m'] = delays[-1] if delays else None
+    return result
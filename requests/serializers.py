@@ -1,4 +1,9 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
+
+from . import counters, outbox, transitions
+from .fieldsets import SparseFieldsetMixin
 from .models import PurchaseRequest, Approval, RequestItem, Attachment, ReceiptValidation
 
 
@@ -20,7 +25,7 @@ class ApprovalSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date']
 
 
-class PurchaseRequestSerializer(serializers.ModelSerializer):
+class PurchaseRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = RequestItemSerializer(many=True, read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
 
@@ -33,6 +38,16 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'items'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'status', 'created_by', 'created_by_name', 'items']
+        expandable_fields = {
+            'approvals': (lambda: ApprovalSerializer(many=True, read_only=True), 'with_approvals'),
+        }
+
+    def update(self, instance, validated_data):
+        """Edit a pending_l1 request; raises transitions.Conflict if it moved on since it was read"""
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        transitions.edit(instance, 'pending_l1', list(validated_data))
+        return instance
 
 
 class PurchaseRequestDetailSerializer(PurchaseRequestSerializer):
@@ -42,20 +57,49 @@ class PurchaseRequestDetailSerializer(PurchaseRequestSerializer):
         fields = PurchaseRequestSerializer.Meta.fields + ['approvals']
 
 
+class PurchaseRequestBulkCreateSerializer(serializers.ListSerializer):
+    """Creates many requests and their items with batched inserts in one transaction"""
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        batch_size = settings.BULK_CREATE_BATCH_SIZE
+        items_data = [data.pop('items', []) for data in validated_data]
+
+        with transaction.atomic():
+            requests = PurchaseRequest.objects.bulk_create(
+                [PurchaseRequest(created_by=user, **data) for data in validated_data],
+                batch_size=batch_size
+            )
+            RequestItem.objects.bulk_create(
+                [
+                    RequestItem(purchase_request=request, **item_data)
+                    for request, request_items in zip(requests, items_data)
+                    for item_data in request_items
+                ],
+                batch_size=batch_size
+            )
+            # bulk_create bypasses save(), so count and publish the new requests here
+            counters.record((user.id, None, request.status) for request in requests)
+            outbox.publish_status_changes((request.id, user.id, None, request.status) for request in requests)
+        return requests
+
+
 class PurchaseRequestCreateSerializer(serializers.ModelSerializer):
     items = RequestItemSerializer(many=True, required=False)
 
     class Meta:
         model = PurchaseRequest
         fields = ['title', 'description', 'amount', 'quantity', 'department', 'vendor_name', 'category', 'urgency', 'proforma_file', 'items']
+        list_serializer_class = PurchaseRequestBulkCreateSerializer
 
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
         validated_data['created_by'] = self.context['request'].user
-        request = PurchaseRequest.objects.create(**validated_data)
-
-        for item_data in items_data:
-            RequestItem.objects.create(purchase_request=request, **item_data)
+        with transaction.atomic():
+            request = PurchaseRequest.objects.create(**validated_data)
+            RequestItem.objects.bulk_create(
+                [RequestItem(purchase_request=request, **item_data) for item_data in items_data]
+            )
 
         return request
 
@@ -64,6 +108,27 @@ class ApprovalActionSerializer(serializers.Serializer):
     comment = serializers.CharField(required=False, allow_blank=True)
 
 
+class BulkApprovalActionSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=1000
+    )
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+    # Per-request comments keyed by request id; fall back to `comment`
+    comments = serializers.DictField(
+        child=serializers.CharField(allow_blank=True),
+        required=False
+    )
+
+    def validate_comments(self, value):
+        try:
+            return {int(key): comment for key, comment in value.items()}
+        except ValueError:
+            raise serializers.ValidationError('Keys must be request ids')
+
+
 class FileUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
 
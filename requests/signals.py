@@ -1,15 +1,93 @@
-from django.db.models.signals import post_save
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import PurchaseRequest
-from documents.services import po_generator
-
-
-# @receiver(post_save, sender=PurchaseRequest)
-# def generate_purchase_order(sender, instance, created, **kwargs):
-#     """Generate PO when request is approved"""
-#     if instance.status == 'approved' and not instance.purchase_order_file:
-#         # Generate PO
-#         po_file = po_generator.generate_po(instance)
-#         if po_file:
-#             instance.purchase_order_file = po_file
-#             instance.save(update_fields=['purchase_order_file'])
\ No newline at end of file
+from django.utils import timezone
+from . import counters
+from .models import Approval, PurchaseRequest, RequestItem
+
+User = get_user_model()
+
+# User columns the request serializers show (created_by_name, approver_name, approver_role)
+SHOWN_USER_FIELDS = ('first_name', 'last_name', 'role')
+
+
+def touch(*filters, **lookups):
+    PurchaseRequest.objects.filter(*filters, **lookups).update(updated_at=timezone.now())
+
+
+def deletion_state(origin):
+    """Bookkeeping for one delete() call, kept on the object it was called on.
+    Django sends every pre_delete of a deletion before its first post_delete."""
+    state = getattr(origin, '_touch_state', None)
+    if state is None:
+        state = origin._touch_state = {'deleting': set(), 'items': Counter()}
+    return state
+
+
+@receiver(pre_delete, sender=PurchaseRequest)
+def mark_deleted_request(sender, instance, origin=None, **kwargs):
+    if origin is not None:
+        deletion_state(origin)['deleting'].add(instance.pk)
+
+
+@receiver(post_delete, sender=PurchaseRequest)
+def release_status_count(sender, instance, origin=None, **kwargs):
+    """Deleted requests (including cascades) leave their status counter"""
+    status = getattr(instance, '_stored_status', None) or instance.status
+    counters.record([(instance.created_by_id, status, None)])
+    if origin is not None:
+        deletion_state(origin)['deleting'].discard(instance.pk)
+
+
+@receiver(post_save, sender=Approval)
+@receiver(post_save, sender=RequestItem)
+def touch_purchase_request(sender, instance, **kwargs):
+    """Nested changes move the parent's updated_at, which the ETags are built on"""
+    touch(id=instance.purchase_request_id)
+
+
+@receiver(pre_delete, sender=RequestItem)
+def count_deleted_item(sender, instance, origin=None, **kwargs):
+    if origin is not None:
+        deletion_state(origin)['items'][instance.purchase_request_id] += 1
+
+
+@receiver(post_delete, sender=RequestItem)
+def touch_after_item_delete(sender, instance, origin=None, **kwargs):
+    """Touch the parent once, after the last of its items in this deletion,
+    and not at all when the parent goes with them"""
+    if origin is None:
+        touch(id=instance.purchase_request_id)
+        return
+    state = deletion_state(origin)
+    request_id = instance.purchase_request_id
+    state['items'][request_id] -= 1
+    if state['items'][request_id] > 0:
+        return
+    del state['items'][request_id]
+    if request_id not in state['deleting']:
+        touch(id=request_id)
+
+
+@receiver(pre_save, sender=User)
+def note_shown_user_change(sender, instance, update_fields=None, **kwargs):
+    """Flag saves that change what the requests show of the user (logins
+    only write last_login and skip the lookup)"""
+    instance._shown_fields_changed = False
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(SHOWN_USER_FIELDS)):
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*SHOWN_USER_FIELDS).first()
+    instance._shown_fields_changed = stored is not None and any(
+        stored[name] != getattr(instance, name) for name in SHOWN_USER_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_shown_user_requests(sender, instance, created=False, **kwargs):
+    """A rename or role change moves updated_at on the requests the user
+    created or approved, so their ETags stop matching"""
+    if not created and getattr(instance, '_shown_fields_changed', False):
+        touch(Q(created_by=instance) | Q(approvals__approver=instance))
@@ -0,0 +1,164 @@
+import re
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import authentication
+from . import counters, transitions
+from .models import Approval, OutboxEvent, PurchaseRequest, ReceiptValidation, RequestItem
+
+User = get_user_model()
+
+
+class StaleWriteTests(TestCase):
+    """A copy read before a transition must not undo it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', role='staff')
+        cls.approver = User.objects.create_user(
+            username='approver1', email='approver1@example.com', password='x', role='approver1'
+        )
+
+    def setUp(self):
+        self.purchase_request = PurchaseRequest.objects.create(
+            title='Laptop', description='For the new hire', amount=Decimal('1200.00'), created_by=self.staff
+        )
+
+    def test_save_of_stale_copy_keeps_status(self):
+        stale = PurchaseRequest.objects.get(pk=self.purchase_request.pk)
+        transitions.decide(PurchaseRequest.objects.get(pk=self.purchase_request.pk), self.approver, 'approved')
+
+        stale.title = 'Laptop and dock'
+        stale.save()
+
+        stored = PurchaseRequest.objects.get(pk=self.purchase_request.pk)
+        self.assertEqual(stored.status, 'pending_l2')
+        self.assertEqual(stored.title, 'Laptop and dock')
+        self.assertEqual(counters.counts(), counters.counts_from_table())
+        self.assertEqual(
+            list(OutboxEvent.objects.order_by('id').values_list('payload__to', flat=True)),
+            ['pending_l1', 'pending_l2']
+        )
+
+    def test_edit_after_approval_conflicts(self):
+        stale = PurchaseRequest.objects.get(pk=self.purchase_request.pk)
+        transitions.decide(PurchaseRequest.objects.get(pk=self.purchase_request.pk), self.approver, 'approved')
+
+        stale.title = 'Laptop and dock'
+        with self.assertRaises(transitions.Conflict) as raised:
+            transitions.edit(stale, 'pending_l1', ['title'])
+        self.assertEqual(raised.exception.current, 'pending_l2')
+        self.assertEqual(PurchaseRequest.objects.get(pk=self.purchase_request.pk).title, 'Laptop')
+        self.assertEqual(Approval.objects.filter(purchase_request=self.purchase_request).count(), 1)
+
+    def test_update_endpoint_edits_pending_request(self):
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.staff)}')
+        response = client.patch(
+            f'/api/request/requests/{self.purchase_request.pk}/', {'title': 'Laptop and dock'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'pending_l1')
+        self.assertEqual(PurchaseRequest.objects.get(pk=self.purchase_request.pk).title, 'Laptop and dock')
+
+
+class CounterTests(TestCase):
+
+    def test_record_locks_counters_in_a_fixed_order(self):
+        owners = [
+            User.objects.create_user(username=f'owner{i}', email=f'owner{i}@example.com', password='x')
+            for i in range(3)
+        ]
+        for changes in ([(owner.id, None, 'pending_l1') for owner in owners],
+                        [(owner.id, None, 'pending_l1') for owner in reversed(owners)]):
+            with CaptureQueriesContext(connection) as captured:
+                counters.record(changes)
+            updates = [query['sql'] for query in captured if query['sql'].startswith('UPDATE')]
+            locked = [re.search(r'"owner_id" (?:= (\d+)|IS NULL)', sql).group(1) for sql in updates]
+            self.assertEqual(locked, [str(owner.id) for owner in owners] + [None])
+
+
+# (role, method, url, max queries). {id} is replaced with a request visible to the role.
+# Every budget includes the query JWT authentication uses to load the user (the
+# user cache is cleared before each call), and the request list/detail/pending
+# budgets the one conditional GET validator query.
+ENDPOINT_BUDGETS = [
+    ('staff', 'get', '/api/request/requests/', 5),
+    ('staff', 'get', '/api/request/requests/{id}/', 5),
+    ('approver1', 'get', '/api/request/requests/', 5),
+    ('approver1', 'get', '/api/request/requests/my_approvals/', 3),
+    ('approver1', 'get', '/api/request/approvals/pending/', 4),
+    ('approver2', 'get', '/api/request/requests/', 5),
+    ('approver2', 'get', '/api/request/approvals/pending/', 4),
+    ('admin', 'get', '/api/request/requests/', 5),
+    ('admin', 'get', '/api/request/requests/{id}/', 5),
+    ('finance', 'get', '/api/finance/', 3),
+    ('finance', 'get', '/api/finance/approved_requests/', 2),
+    ('finance', 'get', '/api/finance/purchase_orders/', 2),
+]
+
+
+class QueryBudgetTests(TestCase):
+    """The read endpoints issue a fixed number of queries, whatever the row count"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {
+            role: User.objects.create_user(
+                username=f'budget_{role}', email=f'budget_{role}@example.com', password=None,
+                first_name='Budget', last_name=role.title(), role=role,
+            )
+            for role in ['staff', 'approver1', 'approver2', 'finance', 'admin']
+        }
+
+    def seed(self, per_status):
+        for status in ['pending_l1', 'pending_l2', 'approved']:
+            for i in range(per_status):
+                purchase_request = PurchaseRequest.objects.create(
+                    title=f'Budget {status} {i}', description='Query budget fixture', amount=Decimal('300.00'),
+                    created_by=self.users['staff'], status=status,
+                    purchase_order_file=f'purchase_orders/po_budget_{status}_{i}.pdf',
+                )
+                for j in range(3):
+                    RequestItem.objects.create(
+                        purchase_request=purchase_request, item_name=f'Item {j}', price=Decimal('100.00')
+                    )
+                if status in ['pending_l2', 'approved']:
+                    Approval.objects.create(purchase_request=purchase_request, approver=self.users['approver1'],
+                                            level=1, status='approved')
+                if status == 'approved':
+                    Approval.objects.create(purchase_request=purchase_request, approver=self.users['approver2'],
+                                            level=2, status='approved')
+                    ReceiptValidation.objects.create(purchase_request=purchase_request,
+                                                     finance_user=self.users['finance'], status='received')
+
+    def measure(self):
+        sample_ids = {
+            'staff': PurchaseRequest.objects.filter(created_by=self.users['staff']).values_list('id', flat=True).first(),
+            'admin': PurchaseRequest.objects.filter(status='approved').values_list('id', flat=True).first(),
+        }
+        counts = []
+        for role, method, url, _ in ENDPOINT_BUDGETS:
+            user = self.users[role]
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            authentication.invalidate(user.pk)
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(url.format(id=sample_ids.get(role)))
+            self.assertEqual(response.status_code, 200, f'{role} {url}')
+            counts.append(len(queries))
+        return counts
+
+    def test_read_endpoints_stay_within_budget(self):
+        self.seed(2)
+        small = self.measure()
+        self.seed(28)
+        large = self.measure()
+        for (role, method, url, budget), n_small, n_large in zip(ENDPOINT_BUDGETS, small, large):
+            with self.subTest(role=role, url=url):
+                self.assertLessEqual(n_large, budget)
+                self.assertEqual(n_small, n_large, 'query count grows with the row count')
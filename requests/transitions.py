@@ -0,0 +1,123 @@
+"""Status transitions as compare-and-swap updates.
+
+A transition moves a request from the status its caller read to a new one
+with a single UPDATE ... WHERE id = %s AND status = <expected>, writing only
+status, updated_at and the columns the transition names. When another writer
+moved the request first, the UPDATE matches no row and Conflict is raised,
+so racing approvers get a 409 instead of an IntegrityError on the approval
+insert. The approval or receipt validation recording the transition is
+inserted after the UPDATE, under the row lock it holds until commit.
+
+Edits and uploads go through edit(), the same conditional UPDATE without a
+status change, so they only land while the request is in the status they
+were allowed for.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, outbox
+
+# Approver level: (expected status, status once approved, status once rejected)
+LEVELS = {
+    1: ('pending_l1', 'pending_l2', 'rejected_l1'),
+    2: ('pending_l2', 'approved', 'rejected_l2'),
+}
+
+
+class Conflict(Exception):
+    """The request was not in the expected status when the transition ran"""
+
+    def __init__(self, purchase_request_id, expected, current):
+        self.purchase_request_id = purchase_request_id
+        self.expected = expected
+        self.current = current
+        if current is None:
+            message = 'Purchase request no longer exists'
+        else:
+            message = f'Purchase request is {current}, expected {expected}'
+        super().__init__(message)
+
+
+def decision(user, outcome):
+    """(level, expected status, new status) for an approver's 'approved' or 'rejected'"""
+    level = 1 if user.role == 'approver1' else 2
+    expected, approved, rejected = LEVELS[level]
+    return level, expected, approved if outcome == 'approved' else rejected
+
+
+def apply(purchase_request, expected, new_status, **changes):
+    """Move purchase_request from expected to new_status with one conditional
+    UPDATE, moving the status counters and publishing the change with it.
+    Raises Conflict when the stored status is no longer expected. Call inside
+    the transaction that records the transition."""
+    from .models import PurchaseRequest
+
+    now = timezone.now()
+    updated = PurchaseRequest.objects.filter(pk=purchase_request.pk, status=expected).update(
+        status=new_status, updated_at=now, **changes
+    )
+    if not updated:
+        current = PurchaseRequest.objects.filter(pk=purchase_request.pk).values_list('status', flat=True).first()
+        raise Conflict(purchase_request.pk, expected, current)
+
+    counters.record([(purchase_request.created_by_id, expected, new_status)])
+    outbox.publish_status_changes([(purchase_request.pk, purchase_request.created_by_id, expected, new_status)])
+    for name, value in changes.items():
+        setattr(purchase_request, name, value)
+    purchase_request.status = purchase_request._stored_status = new_status
+    purchase_request.updated_at = now
+
+
+def edit(purchase_request, expected, fields):
+    """Write `fields` of purchase_request (and updated_at) with one UPDATE that
+    only matches while its stored status is expected. Raises Conflict, and
+    deletes any file the edit stored, when the request moved on."""
+    from .models import PurchaseRequest
+
+    values, stored_files = {}, []
+    for name in [*fields, 'updated_at']:
+        field = purchase_request._meta.get_field(name)
+        file = getattr(purchase_request, field.attname)
+        uncommitted = hasattr(file, '_committed') and file and not file._committed
+        # pre_save stores uploaded files and stamps auto_now fields
+        values[field.attname] = field.pre_save(purchase_request, add=False)
+        if uncommitted:
+            stored_files.append(values[field.attname])
+
+    updated = PurchaseRequest.objects.filter(pk=purchase_request.pk, status=expected).update(**values)
+    if not updated:
+        for file in stored_files:
+            file.delete(save=False)
+        current = PurchaseRequest.objects.filter(pk=purchase_request.pk).values_list('status', flat=True).first()
+        raise Conflict(purchase_request.pk, expected, current)
+
+
+def decide(purchase_request, user, outcome, comment=''):
+    """Approve or reject at the user's level and record the approval"""
+    from .models import Approval
+
+    level, expected, new_status = decision(user, outcome)
+    with transaction.atomic():
+        apply(purchase_request, expected, new_status)
+        # bulk_create skips the post_save that would touch updated_at again
+        Approval.objects.bulk_create([Approval(
+            purchase_request=purchase_request,
+            approver=user,
+            level=level,
+            status=outcome,
+            comment=comment
+        )])
+
+
+def complete(purchase_request, user, receipt_status, comment=''):
+    """Validate an approved request's receipt and record the validation"""
+    from .models import ReceiptValidation
+
+    with transaction.atomic():
+        apply(purchase_request, 'approved', 'completed')
+        ReceiptValidation.objects.create(
+            purchase_request=purchase_request,
+            finance_user=user,
+            status=receipt_status,
+            comment=comment
+        )
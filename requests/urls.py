@@ -1,6 +1,8 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
+from .asyncread import async_view
 
 router = DefaultRouter()
 router.register(r'requests', views.PurchaseRequestViewSet)
@@ -8,4 +10,16 @@ router.register(r'requests', views.PurchaseRequestViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('approvals/pending/', views.pending_approvals, name='pending_approvals'),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    # Async reads in front of the DRF views they fall back to
+    drf_views = {url.name: url.callback for url in router.urls}
+    urlpatterns = [
+        path('requests/', async_view(async_views.request_list, drf_views['purchaserequest-list'])),
+        path('requests/my_approvals/',
+             async_view(async_views.my_approvals, drf_views['purchaserequest-my-approvals'])),
+        re_path(r'^requests/(?P<pk>[0-9]+)/$',
+                async_view(async_views.request_detail, drf_views['purchaserequest-detail'])),
+        path('approvals/pending/', async_view(async_views.pending_approvals, views.pending_approvals)),
+    ] + urlpatterns
@@ -1,24 +1,36 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from . import conditional, counters, fastread, fieldsets, transitions
 from .models import PurchaseRequest, Attachment, ReceiptValidation
 from .serializers import (
     PurchaseRequestSerializer, PurchaseRequestDetailSerializer,
-    PurchaseRequestCreateSerializer, ApprovalActionSerializer,
+    PurchaseRequestCreateSerializer, ApprovalActionSerializer, BulkApprovalActionSerializer,
     FileUploadSerializer, AttachmentSerializer, ReceiptValidationSerializer
 )
+from .pagination import KeysetPagination, PurchaseRequestPagination, wants_keyset
 from .permissions import IsStaff, IsApprover, IsOwnerOrReadOnly, CanApproveRequest
 from finance.permissions import IsFinanceUser
-from documents.services import extract
+from documents.services import jobs
 
+# Statuses behind each role's request queue (see get_queryset)
+QUEUE_STATUSES = {
+    'approver1': ['pending_l1'],
+    'approver2': ['pending_l2'],
+    'finance': ['approved'],
+}
 
-class PurchaseRequestViewSet(viewsets.ModelViewSet):
+
+class PurchaseRequestViewSet(conditional.ConditionalGetMixin, fastread.FastListMixin, viewsets.ModelViewSet):
     queryset = PurchaseRequest.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status']
+    pagination_class = PurchaseRequestPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -34,21 +46,41 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsOwnerOrReadOnly()]
         elif self.action == 'destroy':
             return [IsAuthenticated(), IsStaff()]
-        return [IsAuthenticated()]
+        # Custom actions declare their own permission_classes
+        return super().get_permissions()
 
     def get_queryset(self):
-        user = self.request.user
+        queryset = PurchaseRequest.objects.visible_to(self.request.user).with_items()
+        if self.action == 'retrieve':
+            queryset = queryset.with_approvals()
+        return fieldsets.trim_queryset(queryset, self.get_serializer_class(), self.request)
+
+    def update(self, request, *args, **kwargs):
+        # The serializer saves only while the request is still pending_l1
+        try:
+            return super().update(request, *args, **kwargs)
+        except transitions.Conflict as conflict:
+            return Response({'error': str(conflict), 'status': conflict.current}, status=409)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def counts(self, request):
+        """Status counts for the caller's request views, read from the counters table"""
+        user = request.user
         if user.role == 'staff':
-            return PurchaseRequest.objects.filter(created_by=user)
-        elif user.role == 'approver1':
-            return PurchaseRequest.objects.filter(status='pending_l1')
-        elif user.role == 'approver2':
-            return PurchaseRequest.objects.filter(status='pending_l2')
-        elif user.role == 'finance':
-            return PurchaseRequest.objects.filter(status='approved')
+            status_counts = counters.counts(owner=user)
+        elif user.role in QUEUE_STATUSES:
+            overall = counters.counts()
+            status_counts = {status: overall[status] for status in QUEUE_STATUSES[user.role]}
         elif user.role == 'admin':
-            return PurchaseRequest.objects.all()
-        return PurchaseRequest.objects.none()
+            status_counts = counters.counts()
+        else:
+            return Response({'error': 'Access denied'}, status=403)
+
+        return Response({
+            'role': user.role,
+            'counts': status_counts,
+            'total': sum(status_counts.values())
+        })
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_approvals(self, request):
@@ -59,7 +91,8 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
 
         requests = PurchaseRequest.objects.filter(
             approvals__approver=user
-        ).distinct()
+        ).distinct().with_items()
+        requests = fieldsets.trim_queryset(requests, self.get_serializer_class(), request)
 
         serializer = self.get_serializer(requests, many=True)
         return Response(serializer.data)
@@ -67,19 +100,25 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsStaff])
     def upload_proforma(self, request, pk=None):
         obj = self.get_object()
-        if obj.status != 'pending':
+        if not obj.can_edit():
             return Response({'error': 'Cannot upload to non-pending request'}, status=400)
 
         serializer = FileUploadSerializer(data=request.data)
         if serializer.is_valid():
             obj.proforma_file = serializer.validated_data['file']
-            obj.save()
-
-            # Extract data from proforma
-            extracted_data = extract.extract_proforma_data(obj.proforma_file.path)
-            # TODO: Store extracted data
-
-            return Response({'message': 'Proforma uploaded successfully'})
+            try:
+                transitions.edit(obj, 'pending_l1', ['proforma_file'])
+            except transitions.Conflict as conflict:
+                return Response({'error': str(conflict), 'status': conflict.current}, status=409)
+
+            # Extraction runs in the document worker; clients poll the job
+            job = jobs.enqueue_proforma_extraction(obj)
+
+            return Response({
+                'message': 'Proforma uploaded successfully',
+                'job_id': job.id,
+                'status_url': reverse('document_job_status', args=[job.id]),
+            }, status=status.HTTP_202_ACCEPTED)
         return Response(serializer.errors, status=400)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsFinanceUser])
@@ -91,7 +130,10 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         serializer = FileUploadSerializer(data=request.data)
         if serializer.is_valid():
             obj.receipt_file = serializer.validated_data['file']
-            obj.save()
+            try:
+                transitions.edit(obj, 'approved', ['receipt_file'])
+            except transitions.Conflict as conflict:
+                return Response({'error': str(conflict), 'status': conflict.current}, status=409)
             return Response({'message': 'Receipt uploaded successfully'})
         return Response(serializer.errors, status=400)
 
@@ -101,7 +143,10 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         serializer = ApprovalActionSerializer(data=request.data)
         if serializer.is_valid():
             comment = serializer.validated_data.get('comment', '')
-            obj.approve(request.user, comment)
+            try:
+                obj.approve(request.user, comment)
+            except transitions.Conflict as conflict:
+                return Response({'error': str(conflict), 'status': conflict.current}, status=409)
             return Response({'message': 'Request approved'})
         return Response(serializer.errors, status=400)
 
@@ -111,10 +156,56 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         serializer = ApprovalActionSerializer(data=request.data)
         if serializer.is_valid():
             comment = serializer.validated_data.get('comment', '')
-            obj.reject(request.user, comment)
+            try:
+                obj.reject(request.user, comment)
+            except transitions.Conflict as conflict:
+                return Response({'error': str(conflict), 'status': conflict.current}, status=409)
             return Response({'message': 'Request rejected'})
         return Response(serializer.errors, status=400)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsStaff])
+    def bulk_create(self, request):
+        """Create a list of requests (with nested items) in one transaction"""
+        if not isinstance(request.data, list):
+            return Response({'error': 'Expected a list of requests'}, status=400)
+        if len(request.data) > settings.BULK_CREATE_MAX_REQUESTS:
+            return Response(
+                {'error': f'At most {settings.BULK_CREATE_MAX_REQUESTS} requests per batch'},
+                status=400
+            )
+
+        serializer = PurchaseRequestCreateSerializer(
+            data=request.data, many=True, context=self.get_serializer_context()
+        )
+        if serializer.is_valid():
+            created = serializer.save()
+            return Response({
+                'created': len(created),
+                'ids': [purchase_request.id for purchase_request in created]
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=400)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsApprover])
+    def bulk_decide(self, request):
+        """Approve or reject a batch of requests in one round trip"""
+        serializer = BulkApprovalActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        data = serializer.validated_data
+        ids = list(dict.fromkeys(data['ids']))
+        decision = 'approved' if data['action'] == 'approve' else 'rejected'
+        outcomes = PurchaseRequest.bulk_decide(
+            request.user, ids, decision, data['comment'], data.get('comments')
+        )
+        return Response({
+            'processed': sum(1 for outcome, _ in outcomes.values() if outcome == decision),
+            'results': [
+                {'id': request_id, 'outcome': outcome, 'status': current_status}
+                for request_id, (outcome, current_status) in outcomes.items()
+            ]
+        })
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def upload_attachment(self, request, pk=None):
         obj = self.get_object()
@@ -146,6 +237,18 @@ def pending_approvals(request):
         requests = PurchaseRequest.objects.filter(status='pending_l2')
     else:
         requests = PurchaseRequest.objects.none()
-
-    serializer = PurchaseRequestSerializer(requests, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    etag = conditional.list_etag(request, requests)
+    response = conditional.not_modified(request, etag)
+    if response is not None:
+        return response
+    requests = fieldsets.trim_queryset(requests.with_items(), PurchaseRequestSerializer, request)
+    context = {'fieldset_request': request}
+
+    if wants_keyset(request):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(requests, request)
+        serializer = PurchaseRequestSerializer(page, many=True, context=context)
+        return conditional.add_validators(paginator.get_paginated_response(serializer.data), etag)
+
+    serializer = PurchaseRequestSerializer(requests, many=True, context=context)
+    return conditional.add_validators(Response(serializer.data), etag)
\ No newline at end of file